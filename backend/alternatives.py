@@ -0,0 +1,95 @@
+import math
+from array import array
+
+from map_graph import best_first, parent_path
+
+
+# --- Alternative Routes ---
+# Penalty method: find the best route, make every corridor it uses more
+# expensive, search again, and repeat. Each search is pushed off the routes
+# found so far, so the candidates spread over different corridors, stairs and
+# elevators, which Yen-style k-shortest paths don't do: their next best paths
+# are mostly the best one with a small detour. Candidates are then re-costed
+# with the real edge times and dropped if they share too much of their time
+# with a route already kept, or are too much slower than the best one.
+#
+# Penalties only ever raise edge times, so a lower bound on the real travel
+# time (geometric or landmarks) is still an admissible A* heuristic.
+
+PENALTY = 1.4                # edge time factor per route that used the edge
+MAX_OVERLAP = 0.7            # share of a route's time allowed on a kept route
+MAX_STRETCH = 1.6            # slowest kept route, relative to the best one
+SEARCHES_PER_ROUTE = 4       # search budget per requested route
+MAX_EXPANDED = 100_000       # node expansions budget across all searches
+
+
+def _search(graph, source, target, weights, heuristic, budget):
+    """A* over `weights`. Returns (node-id path or None, expanded nodes);
+    gives up with None after expanding `budget` nodes."""
+    _, _, parent, found, expanded, _ = best_first(graph, source, weights, heuristic, target,
+                                                  budget=budget)
+    if found == -1:
+        return None, expanded
+    return parent_path(parent, target), expanded
+
+
+def _overlap(edges, times, kept_edges):
+    """Share of a route's time spent on corridors (either direction) of a kept route."""
+    total = sum(times)
+    if not total:
+        return 1.0
+    return sum(t for edge, t in zip(edges, times) if edge in kept_edges) / total
+
+
+def alternative_paths(graph, source, target, weights, heuristic, k, seed=None,
+                      penalty=PENALTY, max_overlap=MAX_OVERLAP, max_stretch=MAX_STRETCH,
+                      max_searches=None, max_expanded=MAX_EXPANDED):
+    """Up to `k` distinct routes from `source` to `target`, best first.
+
+    `seed`, if given, is the node-id path to keep as the first route (e.g.
+    the one the regular search returned) instead of searching for it.
+    Returns ([(node-id path, total_time, total_distance)], searches run,
+    nodes expanded); times and distances are over the real `weights`.
+    """
+    if max_searches is None:
+        max_searches = SEARCHES_PER_ROUTE * k
+    edge_dist = graph.edge_dist
+    penalized = array('d', weights)
+    kept = []
+    kept_edges = []  # undirected corridors of each kept route
+    searches = expanded = 0
+    best_time = None
+
+    while len(kept) < k:
+        if seed is not None:
+            path, seed = seed, None
+        else:
+            if searches >= max_searches or expanded >= max_expanded:
+                break
+            path, used = _search(graph, source, target, penalized, heuristic, max_expanded - expanded)
+            searches += 1
+            expanded += used
+            if path is None:
+                break
+
+        edge_ids = [graph.edge_index(a, b) for a, b in zip(path, path[1:])]
+        times = [weights[e] for e in edge_ids]
+        total_time = sum(times)
+        if total_time == math.inf:
+            break  # only impassable edges are left
+        undirected = [(min(a, b), max(a, b)) for a, b in zip(path, path[1:])]
+
+        if best_time is None:
+            best_time = total_time
+        if (total_time <= best_time * max_stretch and
+                all(_overlap(undirected, times, other) <= max_overlap for other in kept_edges)):
+            kept.append((path, total_time, sum(edge_dist[e] for e in edge_ids)))
+            kept_edges.append(set(undirected))
+
+        # Penalize the route whether it was kept or not, so the next search moves on
+        for a, b in zip(path, path[1:]):
+            for e in (graph.edge_index(a, b), graph.edge_index(b, a)):
+                if e != -1:
+                    penalized[e] *= penalty
+
+    return kept, searches, expanded
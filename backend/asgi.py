@@ -0,0 +1,15 @@
+from asgiref.wsgi import WsgiToAsgi
+
+from server import app
+
+
+# --- ASGI Entry Point ---
+# For ASGI servers:
+#
+#   uvicorn --app-dir backend --workers 4 asgi:application
+#
+# WsgiToAsgi runs each Flask request on a worker thread, so CPU-bound route
+# searches never block the event loop; --workers adds processes for actual
+# parallelism, as with gunicorn (see wsgi.py).
+
+application = WsgiToAsgi(app)
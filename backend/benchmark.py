@@ -0,0 +1,388 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import college_map_core as map_logic
+from map_generator import generate_map
+
+
+# --- Benchmarks ---
+# Fixed, seeded workloads over the routing, directions and schedule hot paths.
+# Each workload is timed call by call (p50/p95/p99 latency, throughput) and
+# then re-run once under tracemalloc for peak memory. Results are written as
+# JSON so two runs can be compared with --compare.
+#
+#   python backend/benchmark.py -o before.json
+#   python backend/benchmark.py -o after.json --compare before.json
+#
+# Scale workloads tile the real building (--scale) or generate a synthetic
+# multi-building campus with map_generator (--campus).
+
+MODES = ("normal", "stairs", "wheelchair")
+SEED = 1234
+# Fixed query time outside the break so every run sees the same edge costs
+AT = datetime(2025, 12, 21, 10, 0)
+
+
+# Reference implementation: the original linear-scan A* over the dict API,
+# evaluating calculate_time_cost per edge. Used only for the correctness check.
+def reference_a_star(start, goal, mode="normal", at=AT):
+    if start not in map_logic.node_coordinates or goal not in map_logic.node_coordinates:
+        return None, 0, 0
+
+    open_list = [(start, [start], 0, 0)]
+    closed = []
+
+    while open_list:
+        min_f = float('inf')
+        best_index = 0
+        for i in range(len(open_list)):
+            node, path, g_time, g_dist = open_list[i]
+            if map_logic.node_floors.get(node, 0) != map_logic.node_floors.get(goal, 0):
+                h = map_logic.calculate_different_floors_heuristic(node, goal)
+            else:
+                h = map_logic.calculate_heuristic(node, goal)
+            f = g_time + h
+            if f < min_f:
+                min_f = f
+                best_index = i
+
+        current_node, path, g_time, g_dist = open_list.pop(best_index)
+        closed.append(current_node)
+
+        if current_node == goal:
+            return path, g_time, g_dist
+
+        for neighbor in map_logic.connections.get(current_node, []):
+            if neighbor not in closed and neighbor not in path:
+                step_meters = map_logic.pixels_to_m(map_logic.calc_dist(current_node, neighbor))
+                step_time = map_logic.calculate_time_cost(current_node, neighbor, mode, at)
+                new_g_time = g_time + step_time
+                new_g_dist = g_dist + step_meters
+                new_path = path + [neighbor]
+
+                in_open = False
+                for j, (o_node, o_path, o_time, o_dist) in enumerate(open_list):
+                    if o_node == neighbor:
+                        in_open = True
+                        if new_g_time < o_time:
+                            open_list[j] = (neighbor, new_path, new_g_time, new_g_dist)
+                        break
+                if not in_open:
+                    open_list.append((neighbor, new_path, new_g_time, new_g_dist))
+
+    return None, float('inf'), float('inf')
+
+
+def same_cost(a, b):
+    return a == b or math.isclose(a, b, rel_tol=1e-9)
+
+
+def check_correctness(pairs):
+    """Compare a_star against the reference on (start, goal, mode) triples.
+
+    A different path with the same time and distance is an equal-cost tie
+    (e.g. the landmark heuristic expanding in another order), not a mismatch.
+    """
+    mismatches = []
+    ties = 0
+    for start, goal, mode in pairs:
+        expected_path, expected_time, expected_dist = reference_a_star(start, goal, mode)
+        path, total_time, total_dist = map_logic.a_star(start, goal, mode, at=AT)
+        if not (same_cost(expected_time, total_time) and same_cost(expected_dist, total_dist)
+                and (path is None) == (expected_path is None)):
+            mismatches.append({"start": start, "goal": goal, "mode": mode})
+        elif path != expected_path:
+            ties += 1
+    return {"checked": len(pairs), "mismatches": len(mismatches), "equal_cost_ties": ties,
+            "examples": mismatches[:10]}
+
+
+def expansion_counts(limit):
+    """Mean nodes expanded on cross-floor routes: geometric vs landmark heuristic."""
+    floors = map_logic.node_floors
+    pairs = [(a, b) for a, b in destination_pairs() if floors[a] != floors[b]]
+    random.Random(SEED).shuffle(pairs)
+    pairs = pairs[:limit]
+
+    counts = {}
+    for mode in MODES:
+        for label, use_landmarks in (("geometric", False), ("landmarks", True)):
+            total = 0
+            for a, b in pairs:
+                stats = {}
+                map_logic.a_star(a, b, mode, at=AT, stats=stats, use_landmarks=use_landmarks)
+                total += stats["expanded"]
+            counts.setdefault(mode, {})[label] = total / len(pairs) if pairs else 0.0
+    return counts
+
+
+# --- Workloads ---
+# Each returns a list of zero-argument calls; one call is one timed operation.
+
+def destination_pairs():
+    nodes = map_logic.destination_nodes()
+    return [(a, b) for a in nodes for b in nodes if a != b]
+
+
+def routes_workload(mode, limit):
+    pairs = destination_pairs()
+    random.Random(SEED).shuffle(pairs)
+    return [lambda a=a, b=b: map_logic.a_star(a, b, mode, at=AT) for a, b in pairs[:limit]]
+
+
+def cross_floor_workload(limit):
+    floors = map_logic.node_floors
+    pairs = [(a, b) for a, b in destination_pairs() if floors[a] != floors[b]]
+    random.Random(SEED).shuffle(pairs)
+    calls = []
+    for i, (a, b) in enumerate(pairs[:limit]):
+        mode = MODES[i % len(MODES)]
+        calls.append(lambda a=a, b=b, mode=mode: map_logic.a_star(a, b, mode, at=AT))
+    return calls
+
+
+def time_cost_workload(limit):
+    edges = [(a, b) for a in map_logic.connections for b in map_logic.connections[a]]
+    calls = []
+    for i in range(limit):
+        a, b = edges[i % len(edges)]
+        mode = MODES[i % len(MODES)]
+        calls.append(lambda a=a, b=b, mode=mode: map_logic.calculate_time_cost(a, b, mode, AT))
+    return calls
+
+
+def directions_workload(limit):
+    pairs = destination_pairs()
+    random.Random(SEED).shuffle(pairs)
+    paths = [map_logic.a_star(a, b, "normal", at=AT)[0] for a, b in pairs[:limit]]
+    return [lambda path=path: map_logic.generate_directions(path) for path in paths if path]
+
+
+def schedule_search_workload(limit):
+    rng = random.Random(SEED)
+    words = []
+    for entry in map_logic.schedule.entries():
+        for field in ("course", "instructor", "room"):
+            words.extend(str(entry.get(field) or "").split())
+    # Every prefix of a word, like a user typing into the search box
+    queries = []
+    while len(queries) < limit and words:
+        word = rng.choice(words)
+        queries.extend(word[:i] for i in range(1, len(word) + 1))
+    return [lambda q=q: map_logic.search_schedule(q) for q in queries[:limit]]
+
+
+def occupancy_workload(limit):
+    rng = random.Random(SEED)
+    rooms = [name for name in map_logic.node_coordinates if map_logic.node_types[name] == "room"]
+    calls = []
+    for _ in range(limit):
+        room = rng.choice(rooms)
+        at = datetime(2025, 12, rng.randint(21, 24), rng.randint(8, 17), rng.randint(0, 59))
+        calls.append(lambda room=room, at=at: map_logic.room_occupancy(room, at))
+    return calls
+
+
+def scaled_map(map_data, copies):
+    """Tile the building `copies` times side by side, linking neighbouring
+    copies through their ground-floor entrances (the VIP nodes)."""
+    width = max(node["x"] for node in map_data.values()) + 200
+    scaled = {}
+    for c in range(copies):
+        for name, node in map_data.items():
+            neighbors = [{"name": f"{n['name'] if isinstance(n, dict) else n}#{c}"}
+                         for n in node.get("neighbors", [])]
+            scaled[f"{name}#{c}"] = dict(node, x=node["x"] + c * width, neighbors=neighbors)
+        if c:
+            scaled[f"VIP#{c}"]["neighbors"].append({"name": f"VIP#{c - 1}"})
+            scaled[f"VIP#{c - 1}"]["neighbors"].append({"name": f"VIP#{c}"})
+    return scaled
+
+
+def scaled_routes_workload(limit):
+    rng = random.Random(SEED)
+    nodes = map_logic.destination_nodes()
+    calls = []
+    for i in range(limit):
+        a, b = rng.choice(nodes), rng.choice(nodes)
+        mode = MODES[i % len(MODES)]
+        calls.append(lambda a=a, b=b, mode=mode: map_logic.a_star(a, b, mode, at=AT))
+    return calls
+
+
+# --- Measurement ---
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = math.floor(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(calls):
+    latencies = []
+    clock = time.perf_counter_ns
+    total_start = clock()
+    for call in calls:
+        t0 = clock()
+        call()
+        latencies.append(clock() - t0)
+    total = (clock() - total_start) / 1e9
+
+    tracemalloc.start()
+    for call in calls:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    us = [v / 1000 for v in latencies]
+    return {
+        "ops": len(calls),
+        "p50_us": percentile(us, 50),
+        "p95_us": percentile(us, 95),
+        "p99_us": percentile(us, 99),
+        "mean_us": sum(us) / len(us) if us else 0.0,
+        "throughput_ops_s": len(calls) / total if total else 0.0,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return None
+
+
+def run(args):
+    if not map_logic.load_map_data(args.map):
+        raise SystemExit(1)
+    map_path = args.map
+    if args.route_table:
+        map_logic.use_route_table(os.path.join(tempfile.gettempdir(), "college_map_bench_routes.bin"))
+    else:
+        map_logic.route_table = None
+
+    map_logic.warm_landmarks()
+
+    n = args.ops
+    workloads = {}
+    for mode in MODES:
+        workloads[f"routes_{mode}"] = lambda mode=mode: routes_workload(mode, n)
+    workloads["routes_cross_floor"] = lambda: cross_floor_workload(n)
+    workloads["calculate_time_cost"] = lambda: time_cost_workload(n * 10)
+    workloads["generate_directions"] = lambda: directions_workload(n)
+    workloads["schedule_search"] = lambda: schedule_search_workload(n)
+    workloads["room_occupancy"] = lambda: occupancy_workload(n * 10)
+
+    results = {}
+    for name, build in workloads.items():
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        results[name] = measure(build())
+        print(f"{name:28s} p50 {results[name]['p50_us']:10.1f} us   p99 {results[name]['p99_us']:10.1f} us")
+
+    correctness = None
+    if args.check:
+        pairs = [(a, b, MODES[i % len(MODES)]) for i, (a, b) in enumerate(destination_pairs())]
+        random.Random(SEED).shuffle(pairs)
+        correctness = check_correctness(pairs[:args.check])
+        print(f"correctness: {correctness['mismatches']} mismatches in {correctness['checked']} routes"
+              f" ({correctness['equal_cost_ties']} equal-cost ties)")
+
+    expansions = None
+    if not args.route_table:
+        expansions = expansion_counts(n)
+        for mode, counts in expansions.items():
+            print(f"expanded nodes ({mode}): {counts['geometric']:.1f} geometric,"
+                  f" {counts['landmarks']:.1f} landmarks")
+
+    with open(map_path or map_logic.map_data_path, "r", encoding="utf-8") as f:
+        map_data = json.load(f)
+    scaled_maps = [(f"routes_scaled_{factor}x", factor, lambda factor=factor: scaled_map(map_data, factor))
+                   for factor in args.scale]
+    scaled_maps += [(f"routes_campus_{count}b", count, lambda count=count: generate_map(buildings=count, seed=SEED))
+                    for count in args.campus]
+    for name, factor, build_map in scaled_maps:
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(build_map(), f)
+        try:
+            start = time.perf_counter()
+            map_logic.load_map_data(f.name)
+            load_seconds = time.perf_counter() - start
+            map_logic.route_table = None
+            map_logic.warm_landmarks()
+            results[name] = measure(scaled_routes_workload(max(n // factor, 20)))
+            results[name]["nodes"] = map_logic.graph.node_count
+            results[name]["load_seconds"] = load_seconds
+            print(f"{name:28s} p50 {results[name]['p50_us']:10.1f} us   p99 {results[name]['p99_us']:10.1f} us"
+                  f"   ({results[name]['nodes']} nodes, loaded in {load_seconds:.2f} s)")
+        finally:
+            os.unlink(f.name)
+    map_logic.load_map_data(map_path)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "ops": n,
+            "route_table": args.route_table,
+        },
+        "results": results,
+        "correctness": correctness,
+        "expansions": expansions,
+    }
+
+
+def compare(before, after):
+    print(f"{'workload':28s} {'p50 before':>12s} {'p50 after':>12s} {'change':>8s}")
+    for name, new in after["results"].items():
+        old = before["results"].get(name)
+        if not old:
+            continue
+        change = (new["p50_us"] - old["p50_us"]) / old["p50_us"] * 100 if old["p50_us"] else 0.0
+        print(f"{name:28s} {old['p50_us']:10.1f}us {new['p50_us']:10.1f}us {change:+7.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the routing, directions and schedule hot paths.")
+    parser.add_argument("--map", help="map JSON file (default: college_map_data.json)")
+    parser.add_argument("--ops", type=int, default=2000, help="operations per workload")
+    parser.add_argument("--scale", type=int, nargs="*", default=[10, 100],
+                        help="synthetic map sizes as multiples of the real map")
+    parser.add_argument("--campus", type=int, nargs="*", default=[10],
+                        help="synthetic campus sizes in buildings (5 floors each)")
+    parser.add_argument("--check", type=int, default=300,
+                        help="routes to cross-check against the reference A* (0 to skip)")
+    parser.add_argument("--route-table", action="store_true",
+                        help="serve destination routes from the precomputed table")
+    parser.add_argument("--only", nargs="*", help="run only workloads whose name contains one of these")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", help="results JSON of a previous run to compare against")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
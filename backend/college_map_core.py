@@ -1,12 +1,28 @@
+import hashlib
 import math
 import json
 import os
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
+
+from map_graph import MODES, best_first, bidirectional_dijkstra, compile_graph, nearest_matches, walk_parents
+from parallel_routing import shortest_path_trees
+from landmarks import Landmarks
+from spatial_index import SpatialIndex
+from itinerary import cheapest_insertion, two_opt
+from alternatives import alternative_paths
+from congestion import build_congestion_profile, time_dependent_search, week_bin
+import route_table as route_tables
+import compiled_map as compiled_maps
+from schedule_store import DAY_NAMES, AvailabilityIndex, ScheduleStore, parse_minutes
+from schedule_search import ScheduleSearchIndex
+from shared_state import SharedState
 
 
 # --- 0. Current Time Info ---
-def time ():
-    now = datetime.now()
+# Pass `at` (a datetime) to evaluate a query at a fixed moment instead of now.
+def time (at=None):
+    now = at if at is not None else datetime.now()
     return {
         "now": now,
         "hour": now.hour,        # 0–23
@@ -31,53 +47,384 @@ Ground_First_floorDistance = 6.2  # meters
 Ground_Second_floorDistance = 11.2  # meters
 First_Second_floorDistance = 5.0  # meters
 
+# Per floor gap (index i = between floor i and floor i+1). Floors beyond the
+# measured ones reuse the DEFAULT_* values, so maps can have any number of floors.
+FLOOR_GAP_DISTANCES = [Ground_First_floorDistance, First_Second_floorDistance]  # meters
+FLOOR_GAP_STAIRS_TIMES = [Ground_First_Floor_StairsTime, First_Second_Floor_StairsTime]  # seconds
+DEFAULT_FLOOR_DISTANCE = First_Second_floorDistance  # meters
+DEFAULT_STAIRS_TIME = First_Second_Floor_StairsTime  # seconds per floor
+# Measured elevator rides; other rides cost door time plus time per floor
+ELEVATOR_TIMES = {
+    (0, 1): Ground_First_Floor_ElevTime,
+    (1, 2): First_Second_Floor_ElevTime,
+    (0, 2): Ground_Second_Floor_ElevTime,
+}
+ELEVATOR_DOOR_TIME = 11  # seconds
+ELEVATOR_TIME_PER_FLOOR = 7  # seconds
+
 
 # --- 2. Data Structures ---
+# Everything a query reads lives in one immutable MapSnapshot. Loads and
+# closures build a new snapshot and swap it in with a single assignment, so a
+# concurrent request sees either the old map or the new one, never a mix;
+# queries grab `snapshot` once and use only that.
+#
+# `graph` is the compiled, integer-indexed map used by the search engines.
+# `base_graph` is the map as loaded, before any closures (see
+# set_node_available); route tables and landmarks are built on it, which keeps
+# them valid lower bounds however many nodes or edges are closed.
+
+class MapSnapshot:
+    def __init__(self, graph, base_graph, landmarks, spatial, closed_nodes, closed_edges,
+                 version, map_path, map_hash):
+        self.graph = graph
+        self.base_graph = base_graph
+        self.landmarks = landmarks        # ALT heuristic tables, built per mode on first use
+        self.spatial = spatial            # per-floor grid for snapping x/y to nodes and edges
+        self.closed_nodes = closed_nodes  # node names closed at runtime
+        self.closed_edges = closed_edges  # frozenset({a, b}) node name pairs closed at runtime
+        self.version = version            # bumped on every load and availability change
+        self.map_path = map_path          # map JSON the graph was loaded from
+        self.map_hash = map_hash          # sha256 of that JSON, used to spot stale tables
+
+snapshot = None
+_update_lock = threading.Lock()
+route_table = None     # precomputed destination routes, see use_route_table()
+compiled_map_path = compiled_maps.DEFAULT_PATH  # binary map, used when not stale
+USE_LANDMARKS = True   # tighten the A* heuristic with landmarks
+closures = None        # SharedState holding closures for every worker process, see share_closures()
+closures_version = 0   # bumped on every closure change, shared with the other processes
+
+# Search engines for a_star: "astar", "bidir" (bidirectional Dijkstra),
+# "auto", which goes bidirectional for long trips when no landmark heuristic
+# is available (landmark A* beats bidirectional Dijkstra when it is), and
+# "td", time-dependent A* with schedule-derived corridor congestion
+ENGINES = ("astar", "bidir", "auto", "td")
+BIDIR_MIN_ESTIMATE = 90  # seconds of lower-bound travel time
+
+# Mirrors of the current snapshot, kept for compatibility. The four dicts are
+# read-only views on `graph`.
+graph = None
+base_graph = None
+landmarks = None
+closed_nodes = frozenset()
+closed_edges = frozenset()
+map_version = 0
+map_data_path = None
+map_data_hash = None
 node_coordinates = {}
 connections = {}
 node_types = {}
 node_floors = {}
 
-def load_map_data(json_file_path=None):
-    global node_coordinates, connections, node_types, node_floors
-
+def find_map_file():
+    here = os.path.dirname(__file__)
+    candidates = [
+        os.path.join(here, "college_map_data.json"),
+        os.path.join(here, "..", "college_map_data.json")
+    ]
+    for p in candidates:
+        if os.path.exists(p):
+            return p
+    return None
+
+def cost_params():
+    # Every setting compile_graph bakes into the edge times; a compiled map
+    # file built with different values is stale
+    return repr((METERS_PER_PIXEL, Human_avg_Speed, ELEVATOR_DELAY_DURING_BREAK,
+                 FLOOR_GAP_DISTANCES, FLOOR_GAP_STAIRS_TIMES, DEFAULT_FLOOR_DISTANCE,
+                 DEFAULT_STAIRS_TIME, sorted(ELEVATOR_TIMES.items()),
+                 ELEVATOR_DOOR_TIME, ELEVATOR_TIME_PER_FLOOR))
+
+def load_map_data(json_file_path=None, force=False):
+    """Load (or reload) the map. Returns False if the map file is missing.
+
+    The compiled map file (see compiled_map.py) is used when it was built
+    from this exact JSON, otherwise the JSON is parsed and compiled. Loading
+    the map that is already live is a no-op unless `force` is set.
+    """
     if json_file_path is None:
-        here = os.path.dirname(__file__)
-        candidates = [
-            os.path.join(here, "college_map_data.json"),
-            os.path.join(here, "..", "college_map_data.json")
-        ]
-        for p in candidates:
-            if os.path.exists(p):
-                json_file_path = p
-                break
+        json_file_path = find_map_file()
 
     if not json_file_path or not os.path.exists(json_file_path):
         print("Error: Map data file 'college_map_data.json' not found.")
         return False
 
-    with open(json_file_path, "r", encoding="utf-8") as f:
-        map_data = json.load(f)
+    with open(json_file_path, "rb") as f:
+        raw = f.read()
+    map_hash = hashlib.sha256(raw).hexdigest()
+    snap = snapshot
+    if not force and snap is not None and snap.map_hash == map_hash and snap.map_path == json_file_path:
+        return True
+
+    # Build the new graph fully before swapping it in, so a reload never
+    # leaves stale entries from the previous map behind.
+    new_graph = compiled_maps.load_compiled_map(compiled_map_path, map_hash, cost_params())
+    if new_graph is None:
+        if os.path.exists(compiled_map_path) and json_file_path == find_map_file():
+            print("Note: compiled map is stale, loading the JSON "
+                  "(rebuild it with python backend/compiled_map.py)")
+        new_graph = compile_graph(json.loads(raw.decode("utf-8")), edge_time_cost, METERS_PER_PIXEL)
+
+    with _update_lock:
+        # Closures survive a reload as long as what they refer to still exists
+        _publish(new_graph, Landmarks(new_graph), SpatialIndex(new_graph),
+                 frozenset(n for n in closed_nodes if n in new_graph.index),
+                 frozenset(e for e in closed_edges if _has_connection(new_graph, *e)),
+                 json_file_path, map_hash)
 
-    for node_name, data in map_data.items():
-        # Coordinates
-        node_coordinates[node_name] = (data["x"], data["y"])
+    return True
 
-        # Neighbors
-        neighbors = data.get("neighbors", [])
-        if neighbors and isinstance(neighbors[0], dict):
-            connections[node_name] = [n["name"] for n in neighbors]
-        else:
-            connections[node_name] = neighbors
 
-        # Type & Floor (NEW)
-        node_types[node_name] = data.get("type", "corridor")
-        node_floors[node_name] = data.get("floor", 0)
+def _has_connection(g, node_a, node_b):
+    if node_a not in g.index or node_b not in g.index:
+        return False
+    a, b = g.index[node_a], g.index[node_b]
+    return g.has_edge(a, b) or g.has_edge(b, a)
 
-    return True
 
+def _publish(new_base, new_landmarks, new_spatial, nodes, edges, map_path, map_hash):
+    # Build the active graph from the base one and swap in a new snapshot.
+    # Callers hold _update_lock.
+    global snapshot, graph, base_graph, landmarks, closed_nodes, closed_edges
+    global map_version, map_data_path, map_data_hash
+    global node_coordinates, connections, node_types, node_floors
 
-load_map_data()
+    index = new_base.index
+    if nodes or edges:
+        new_graph = new_base.without(
+            (index[n] for n in nodes),
+            (tuple(index[n] for n in sorted(e)) for e in edges))
+    else:
+        new_graph = new_base
+
+    snap = MapSnapshot(new_graph, new_base, new_landmarks, new_spatial, nodes, edges,
+                       map_version + 1, map_path, map_hash)
+    snapshot = snap
+
+    graph, base_graph, landmarks = snap.graph, snap.base_graph, snap.landmarks
+    closed_nodes, closed_edges, map_version = snap.closed_nodes, snap.closed_edges, snap.version
+    map_data_path, map_data_hash = snap.map_path, snap.map_hash
+    node_coordinates = new_graph.coordinates_view()
+    connections = new_graph.connections_view()
+    node_types = new_graph.types_view()
+    node_floors = new_graph.floors_view()
+    return snap.version
+
+
+def _apply_availability(nodes, edges):
+    snap = snapshot
+    return _publish(snap.base_graph, snap.landmarks, snap.spatial, nodes, edges,
+                    snap.map_path, snap.map_hash)
+
+
+# Closures can be kept in a file shared by every worker process of a
+# multi-process server, so a closure made through one worker reaches the
+# others (see shared_state.py). They then also survive restarts.
+
+def share_closures(path):
+    """Keep closures in `path`, shared by every process that calls this."""
+    global closures
+    closures = SharedState(path)
+    sync_closures()
+
+def sync_closures():
+    """Apply closures made through other processes.
+
+    Returns (previous snapshot, new snapshot) if anything changed, else None.
+    """
+    shared = closures
+    if shared is None:
+        return None
+    state = shared.changed()
+    if state is None:
+        return None
+    with _update_lock:
+        return _apply_shared(state)
+
+def _apply_shared(state):
+    # Callers hold _update_lock. Names the map doesn't have are ignored.
+    global closures_version
+    previous = snapshot
+    g = previous.base_graph
+    nodes = frozenset(n for n in state.get("closed_nodes", ()) if n in g.index)
+    edges = frozenset(frozenset(e) for e in state.get("closed_edges", ())
+                      if len(e) == 2 and _has_connection(g, *e))
+    closures_version = state.get("version", closures_version)
+    if nodes == previous.closed_nodes and edges == previous.closed_edges:
+        return None
+    _apply_availability(nodes, edges)
+    return previous, snapshot
+
+def _set_closures(nodes, edges):
+    # Callers hold _update_lock
+    global closures_version
+    if closures is None:
+        closures_version += 1
+        return _apply_availability(nodes, edges)
+
+    def change(state):
+        # Re-applied to the file's current state, which may hold closures
+        # made through other processes since this one last synced
+        current = snapshot
+        closed = set(state.get("closed_nodes", ()))
+        closed |= nodes - current.closed_nodes
+        closed -= current.closed_nodes - nodes
+        closed_edges = {frozenset(e) for e in state.get("closed_edges", ()) if len(e) == 2}
+        closed_edges |= edges - current.closed_edges
+        closed_edges -= current.closed_edges - edges
+        state["closed_nodes"] = sorted(closed)
+        state["closed_edges"] = sorted(sorted(e) for e in closed_edges)
+        return state
+
+    _apply_shared(closures.update(change))
+    return snapshot.version
+
+
+def set_node_available(node, available=True):
+    """Open or close a node (a door, an elevator...) without reloading the map.
+
+    Returns the new map version. Raises ValueError for unknown nodes.
+    """
+    with _update_lock:
+        snap = snapshot
+        if node not in snap.base_graph.index:
+            raise ValueError(f"Unknown node: {node}")
+        nodes = snap.closed_nodes - {node} if available else snap.closed_nodes | {node}
+        if nodes == snap.closed_nodes:
+            return snap.version
+        return _set_closures(nodes, snap.closed_edges)
+
+
+def set_edge_available(node_a, node_b, available=True):
+    """Open or close the connection between two neighbouring nodes (both ways).
+
+    Returns the new map version. Raises ValueError if there is no such edge.
+    """
+    with _update_lock:
+        snap = snapshot
+        if not _has_connection(snap.base_graph, node_a, node_b):
+            raise ValueError(f"No connection between {node_a} and {node_b}")
+        edge = frozenset((node_a, node_b))
+        edges = snap.closed_edges - {edge} if available else snap.closed_edges | {edge}
+        if edges == snap.closed_edges:
+            return snap.version
+        return _set_closures(snap.closed_nodes, edges)
+
+
+def path_is_open(path, snap=None):
+    # True if a path avoids every closed node and edge
+    snap = snap or snapshot
+    if not snap.closed_nodes and not snap.closed_edges:
+        return True
+    if any(node in snap.closed_nodes for node in path):
+        return False
+    return not any(frozenset(pair) in snap.closed_edges for pair in zip(path, path[1:]))
+
+
+# Snapping pixel positions (map clicks, QR codes with coordinates) to the graph
+
+def snap_to_nodes(x, y, floor, k=1, node_types=None, open_only=False, snap=None):
+    """The `k` nodes on `floor` closest to (x, y), as (name, distance in pixels).
+
+    Optionally only nodes of some types, or only nodes not closed right now.
+    """
+    snap = snap or snapshot
+    g = snap.base_graph
+    accept = None
+    if node_types or open_only:
+        def accept(i):
+            if node_types and g.node_type(i) not in node_types:
+                return False
+            return not open_only or g.names[i] not in snap.closed_nodes
+    return [(g.names[i], d) for i, d in snap.spatial.nearest_nodes(floor, x, y, k, accept)]
+
+def snap_to_edge(x, y, floor, open_only=False, snap=None):
+    """The closest corridor segment on `floor` to (x, y), or None.
+
+    Returns (from, to, t, px, py, distance in pixels) with (px, py) the closest
+    point, `t` of the way from `from` to `to`.
+    """
+    snap = snap or snapshot
+    g = snap.base_graph
+    accept = None
+    if open_only:
+        def accept(a, b):
+            return path_is_open([g.names[a], g.names[b]], snap)
+    found = snap.spatial.nearest_edge(floor, x, y, accept)
+    if found is None:
+        return None
+    a, b, t, px, py, d = found
+    return g.names[a], g.names[b], t, px, py, d
+
+def resolve_location(location, snap=None):
+    # A node name, or {"x", "y", "floor"} / (x, y, floor) snapped to the
+    # nearest open node on that floor; None if it can't be resolved
+    if isinstance(location, str):
+        return location
+    try:
+        if isinstance(location, dict):
+            x, y, floor = float(location["x"]), float(location["y"]), int(location.get("floor", 0))
+        else:
+            x, y, floor = location
+    except (KeyError, TypeError, ValueError):
+        return None
+    nodes = snap_to_nodes(x, y, floor, open_only=True, snap=snap)
+    return nodes[0][0] if nodes else None
+
+
+# Waypoint-style names (b_point, c_point, C_GF_05, ...) that aren't destinations
+WAYPOINT_PATTERNS = ['_point', 'c_gf_', 'c_ff_', 'c_sf_', '_corridor']
+
+def is_destination(node_name, g=None):
+    # Rooms, departments, stairs and elevators are meaningful start/end points.
+    # `g` is the graph of the caller's snapshot (default: the live one).
+    if g is None:
+        g = snapshot.graph
+    i = g.index.get(node_name)
+    if i is None or g.node_type(i) == "corridor":
+        return False
+    name_lower = node_name.lower()
+    return not any(pattern in name_lower for pattern in WAYPOINT_PATTERNS)
+
+def destination_nodes(g=None):
+    if g is None:
+        g = snapshot.graph
+    return sorted(name for name in g.names if is_destination(name, g))
+
+def use_route_table(path=route_tables.DEFAULT_PATH, build=True, max_bytes=None):
+    """Serve destination -> destination routes from a precomputed table.
+
+    Loads the table from `path` (memory-mapped) or, if it is missing or was
+    built from a different map file or cost parameters, rebuilds and saves
+    it. With `build` off, or if the table would be bigger than `max_bytes`,
+    a missing or stale table is not rebuilt and routes are searched instead.
+    """
+    global route_table
+    snap = snapshot
+    table = route_tables.load_route_table(path, snap.map_hash, cost_params())
+    if table is None:
+        destinations = destination_nodes(snap.base_graph)
+        size = route_tables.table_size(snap.base_graph.node_count, len(destinations))
+        if not build or (max_bytes is not None and size > max_bytes):
+            print(f"Note: no up-to-date route table ({size / 2**20:.0f} MiB to build), searching "
+                  "every route (build it with python backend/route_table.py)")
+            route_table = None
+            return None
+        table = route_tables.build_route_table(snap.base_graph, destinations, snap.map_hash,
+                                                cost_params())
+        try:
+            route_tables.save_route_table(table, path)
+        except OSError as e:
+            print(f"Warning: could not save route table: {e}")
+    route_table = table
+    return table
+
+
+def warm_landmarks():
+    # Build the per-mode landmark tables now instead of on the first query
+    for mode in MODES:
+        snapshot.landmarks.table(mode)
 
 
 # --- 4. Helper Functions ---
@@ -96,30 +443,35 @@ def calc_dist(n1, n2):
 def pixels_to_m(dist_pixels):
     return dist_pixels * METERS_PER_PIXEL   
 
-def calculate_time_cost(node_a, node_b, mode="normal"):
-    dist_pixels = calc_dist(node_a, node_b)
-    real_dist_m = pixels_to_m(dist_pixels)
-    is_stairs = (node_types.get(node_a) == 'stairs' and node_types.get(node_b) == 'stairs')
-    is_elevator = (node_types.get(node_a) == 'elevator' and node_types.get(node_b) == 'elevator')
-    node_a_floor = node_floors.get(node_a, 0)
-    node_b_floor = node_floors.get(node_b, 0)
-    current = time()
-    current_hour = current["hour"]
-    is_break = BREAK_START <= current_hour < BREAK_END
-    
+def _floor_gaps(values, default, floor_a, floor_b):
+    low, high = min(floor_a, floor_b), max(floor_a, floor_b)
+    return sum(values[i] if 0 <= i < len(values) else default for i in range(low, high))
+
+def stairs_time(floor_a, floor_b):
+    return _floor_gaps(FLOOR_GAP_STAIRS_TIMES, DEFAULT_STAIRS_TIME, floor_a, floor_b)
+
+def elevator_time(floor_a, floor_b):
+    ride = ELEVATOR_TIMES.get((min(floor_a, floor_b), max(floor_a, floor_b)))
+    if ride is None:
+        ride = ELEVATOR_DOOR_TIME + ELEVATOR_TIME_PER_FLOOR * abs(floor_a - floor_b)
+    return ride
+
+def is_break_time(hour):
+    return BREAK_START <= hour < BREAK_END
+
+def edge_time_cost(type_a, type_b, node_a_floor, node_b_floor, real_dist_m, mode="normal", is_break=False):
+    is_stairs = (type_a == 'stairs' and type_b == 'stairs')
+    is_elevator = (type_a == 'elevator' and type_b == 'elevator')
+
     if is_stairs:
         if mode == "wheelchair":
             return float ('inf')
         
         # In 'stairs' mode, we use standard stairs time without any penalty
-        if (node_a_floor == 2 and node_b_floor==1) or (node_a_floor == 1 and node_b_floor==2):
-            return First_Second_Floor_StairsTime
-        if (node_a_floor == 1 and node_b_floor==0) or (node_a_floor == 0 and node_b_floor==1):
-            return Ground_First_Floor_StairsTime
-        if (node_a_floor == 2 and node_b_floor==0) or (node_a_floor == 0 and node_b_floor==2):
-            return Ground_Second_Floor_StairsTime 
+        if node_a_floor != node_b_floor:
+            return stairs_time(node_a_floor, node_b_floor)
     
-    if is_elevator:
+    if is_elevator and node_a_floor != node_b_floor:
         Elev_time = 0
         if is_break:
             Elev_time = ELEVATOR_DELAY_DURING_BREAK
@@ -128,91 +480,449 @@ def calculate_time_cost(node_a, node_b, mode="normal"):
         if mode == "stairs":
             Elev_time += 120 # Added 2 min penalty to elevator in stairs mode
 
-        if (node_a_floor == 0 and node_b_floor==1) or (node_a_floor == 1 and node_b_floor==0):
-            return Ground_First_Floor_ElevTime + Elev_time
-        if (node_a_floor == 1 and node_b_floor==2) or (node_a_floor == 2 and node_b_floor==1):
-            return First_Second_Floor_ElevTime + Elev_time
-        if (node_a_floor == 0 and node_b_floor==2) or (node_a_floor == 2 and node_b_floor==0):
-            return Ground_Second_Floor_ElevTime + Elev_time
+        return elevator_time(node_a_floor, node_b_floor) + Elev_time
         
     return real_dist_m / Human_avg_Speed 
 
+def calculate_time_cost(node_a, node_b, mode="normal", at=None):
+    dist_pixels = calc_dist(node_a, node_b)
+    real_dist_m = pixels_to_m(dist_pixels)
+    current = time(at)
+    is_break = is_break_time(current["hour"])
+    return edge_time_cost(node_types.get(node_a), node_types.get(node_b),
+                          node_floors.get(node_a, 0), node_floors.get(node_b, 0),
+                          real_dist_m, mode, is_break)
+
 def calculate_heuristic(node, goal):
     dist_pixels = calc_dist(node, goal)
     real_dist_m = pixels_to_m(dist_pixels)  
     return real_dist_m / MAX_SPEED
 
+def floor_distance(node_floor, goal_floor):
+    # Vertical distance in meters between two floors
+    return _floor_gaps(FLOOR_GAP_DISTANCES, DEFAULT_FLOOR_DISTANCE, node_floor, goal_floor)
+
 def calculate_different_floors_heuristic(node, goal):
     dist_pixels = calc_dist(node, goal)
     real_dist_m = pixels_to_m(dist_pixels) 
-    node_floor = node_floors.get(node, 0)
-    goal_floor = node_floors.get(goal, 0)
-  
-    if (node_floor == 0 and goal_floor == 1) or (node_floor == 1 and goal_floor == 0): 
-        return calc_hypotenuse(real_dist_m, Ground_First_floorDistance)/ MAX_SPEED
-    elif node_floor ==0 and goal_floor==2 or node_floor ==2 and goal_floor==0 :
-        return calc_hypotenuse(real_dist_m, Ground_Second_floorDistance)/ MAX_SPEED
-    elif node_floor ==1 and goal_floor==2 or node_floor ==2 and goal_floor==1 :
-        return calc_hypotenuse(real_dist_m, First_Second_floorDistance)/ MAX_SPEED
+    vertical_m = floor_distance(node_floors.get(node, 0), node_floors.get(goal, 0))
+    return calc_hypotenuse(real_dist_m, vertical_m)/ MAX_SPEED
 
 # A* Algorithm (Cumulative Time + Distance)
 
-def a_star(start, goal, mode ="normal"):
-    if start not in node_coordinates or goal not in node_coordinates:
+def _heuristic(snap, target, mode, use_landmarks=None):
+    # Lower bound on the travel time from a node to `target`; returns
+    # (heuristic, landmark table or None)
+    g = snap.graph
+    xs, ys, floors = g.x, g.y, g.floor
+    goal_x, goal_y, goal_floor = xs[target], ys[target], floors[target]
+
+    if use_landmarks is None:
+        use_landmarks = USE_LANDMARKS
+    alt = snap.landmarks.table(mode) if use_landmarks and snap.landmarks.landmarks else None
+    alt_terms = alt.target_terms(target) if alt else None
+
+    def heuristic(i):
+        dx = xs[i] - goal_x
+        dy = ys[i] - goal_y
+        real_dist_m = math.sqrt(dx*dx + dy*dy) * METERS_PER_PIXEL
+        if floors[i] != goal_floor:
+            h = calc_hypotenuse(real_dist_m, floor_distance(floors[i], goal_floor)) / MAX_SPEED
+        else:
+            h = real_dist_m / MAX_SPEED
+        if alt is not None:
+            # Both bounds are admissible, so the larger one is too
+            h = max(h, alt.bound(alt_terms, i))
+        return h
+
+    return heuristic, alt
+
+def a_star(start, goal, mode ="normal", at=None, stats=None, use_landmarks=None, engine="astar",
+           snap=None):
+    # `start`/`goal` are node names or (x, y, floor) positions (see resolve_location).
+    # `stats`, if given, receives the number of expanded nodes and relaxed edges
+    # The whole query runs on one snapshot, even if the map is swapped meanwhile;
+    # pass `snap` to share it with the rest of a request (directions...)
+    if snap is None:
+        snap = snapshot
+    g = snap.graph
+    start = resolve_location(start, snap)
+    goal = resolve_location(goal, snap)
+    if start not in g.index or goal not in g.index:
         print("Error: Invalid start or goal node names.")
         return None, 0, 0
 
-    #            (node, path, g_time_seconds, g_distance_meters)
-    open_list = [(start, [start], 0, 0)]
-    closed = []
-
-    while open_list:
-        min_f = float('inf')
-        best_index = 0
-
-        # Select best node based on f = g_time + h_time
-        for i in range(len(open_list)):
-            node, path, g_time, g_dist = open_list[i]
-            if node_floors.get(node, 0) != node_floors.get(goal, 0):
-                h = calculate_different_floors_heuristic(node, goal)
-            else:
-                h = calculate_heuristic(node, goal)
-            f = g_time + h
-            if f < min_f:
-                min_f = f
-                best_index = i
-
-        current_node, path, g_time, g_dist = open_list.pop(best_index)
-        closed.append(current_node)
-
-        if current_node == goal:
-            return path, g_time, g_dist
+    # Per-edge times for this mode, resolved once for the whole query so the
+    # cost can't change mid-search if it crosses the break boundary
+    current = time(at)
+    is_break = is_break_time(current["hour"])
+
+    # Tables are only trusted for the exact map file they were built from
+    table = route_table
+    if engine != "td" and table is not None and table.map_hash == snap.map_hash:
+        result = table.lookup(g, start, goal, mode, is_break)
+        # A closure only invalidates the table routes that go through it
+        if result is not None and result[0] is not None and not path_is_open(result[0], snap):
+            result = None
+        if result is not None:
+            if stats is not None:
+                stats.update(expanded=0, relaxed=0, route_table=True)
+            return result
+
+    source = g.index[start]
+    target = g.index[goal]
+    weights = g.weights(mode, is_break)
+    heuristic, alt = _heuristic(snap, target, mode, use_landmarks)
+
+    if engine == "auto":
+        engine = "bidir" if alt is None and heuristic(source) >= BIDIR_MIN_ESTIMATE else "astar"
+    if engine == "bidir":
+        path_ids, total_time, total_dist = bidirectional_dijkstra(
+            g, source, target, weights, g.reversed().weights(mode, is_break))
+        # Routes that only exist through impassable (inf) edges are left to A*
+        if path_ids is not None:
+            if stats is not None:
+                stats.update(expanded=None, relaxed=None, route_table=False, engine="bidir")
+            return [g.names[i] for i in path_ids], total_time, total_dist
+    if engine == "td":
+        start_minute = current["weekday"] * 1440 + current["hour"] * 60 + current["minute"]
+        path_ids, total_time, total_dist, expanded = time_dependent_search(
+            g, source, target, weights, heuristic, congestion_profile(snap), start_minute)
+        if stats is not None:
+            stats.update(expanded=expanded, relaxed=None, route_table=False, engine="td")
+        if path_ids is None:
+            return None, float('inf'), float('inf')
+        return [g.names[i] for i in path_ids], total_time, total_dist
+
+    # A*: same tie-breaking as every other search (see best_first)
+    g_time, g_dist, parent, found, expanded, relaxed = best_first(g, source, weights, heuristic, target)
+    if stats is not None:
+        stats.update(expanded=expanded, relaxed=relaxed, route_table=False)
+    if found == -1:
+        return None, float('inf'), float('inf')
+    return walk_parents(g, parent, source, target), g_time[target], g_dist[target]
+
+
+def alternative_routes(start, goal, k=3, mode="normal", at=None, first=None, stats=None,
+                       snap=None):
+    # Up to `k` diverse routes, best first, as (path, total_time, total_dist).
+    # `first`, if given, is the route a_star already returned for this query;
+    # it is kept as the first route so the alternatives are built around it.
+    # Alternatives use the static edge times of the current break regime, so
+    # `first` must come from a static search too (not the "td" engine).
+    if snap is None:
+        snap = snapshot
+    g = snap.graph
+    start = resolve_location(start, snap)
+    goal = resolve_location(goal, snap)
+    if start not in g.index or goal not in g.index:
+        return []
 
-        if current_node in connections:
-            for neighbor in connections[current_node]:
-                if neighbor not in closed and neighbor not in path:
-                    step_pixels = calc_dist(current_node, neighbor)
-                    step_meters = pixels_to_m(step_pixels)  
-                    step_time = calculate_time_cost(current_node, neighbor, mode)
+    is_break = is_break_time(time(at)["hour"])
+    target = g.index[goal]
+    heuristic, _ = _heuristic(snap, target, mode)
+    seed = [g.index[name] for name in first] if first else None
+    routes, searches, expanded = alternative_paths(
+        g, g.index[start], target, g.weights(mode, is_break), heuristic, k, seed=seed)
+    if stats is not None:
+        stats.update(searches=searches, expanded=expanded)
+    return [([g.names[i] for i in path], total_time, total_dist)
+            for path, total_time, total_dist in routes]
+
+
+# Batch routing: one Dijkstra per source answers every target
+
+def route_batch(sources, targets=None, mode="normal", at=None, include_paths=False, workers=1):
+    """Travel times (and optionally paths) from each source to every target.
+
+    `targets` defaults to all destination nodes. Returns a dict with
+    `sources`, `targets` and row-per-source `times` / `distances` matrices
+    (inf when unreachable), plus `paths` (None when unreachable) if
+    `include_paths` is set. `workers` > 1 spreads the sources over a
+    process pool (None uses every core). Raises ValueError on unknown
+    node names.
+    """
+    g = snapshot.graph
+    if targets is None:
+        targets = destination_nodes(g)
+    unknown = [name for name in list(sources) + list(targets) if name not in g.index]
+    if unknown:
+        raise ValueError(f"Invalid node names: {', '.join(unknown)}")
+
+    is_break = is_break_time(time(at)["hour"])
+    source_ids = [g.index[name] for name in sources]
+    target_ids = [g.index[name] for name in targets]
+
+    result = {"sources": list(sources), "targets": list(targets), "times": [], "distances": []}
+    if include_paths:
+        result["paths"] = []
+
+    trees = shortest_path_trees(g, source_ids, mode, is_break, targets=target_ids,
+                                workers=workers, with_parents=include_paths)
+    for source, (times, dists, parent) in zip(source_ids, trees):
+        result["times"].append(list(times))
+        result["distances"].append(list(dists))
+        if include_paths:
+            result["paths"].append([walk_parents(g, parent, source, t) for t in target_ids])
+
+    return result
 
-                    new_g_time = g_time + step_time
-                    new_g_dist = g_dist + step_meters 
 
-                    new_path = path + [neighbor]
+load_map_data()
 
-                    in_open = False
-                    for j, (o_node, o_path, o_time, o_dist) in enumerate(open_list):
-                        if o_node == neighbor:
-                            in_open = True
-                            if new_g_time < o_time:
-                                open_list[j] = (neighbor, new_path, new_g_time, new_g_dist)
-                            break
 
-                    if not in_open:
-                        open_list.append((neighbor, new_path, new_g_time, new_g_dist))
+# schedule.json, parsed and indexed once (reloaded when the file changes)
+schedule = ScheduleStore()
+schedule_index = ScheduleSearchIndex(schedule)
+
+def room_occupancy(target_room, at=None):
+    # The lecture occupying the room at `at` (default now), or None
+    current = time(at)
+    day_name = DAY_NAMES.get(current["weekday"], "Unknown")
+    return schedule.occupancy(target_room, day_name, current["hour"] * 60 + current["minute"])
+
+_congestion = (None, None)  # ((base graph, schedule version), CongestionProfile)
+
+def congestion_profile(snap=None):
+    # Rebuilt only when the map or the schedule has changed. The cache entry
+    # is one tuple, so concurrent callers at worst build the same profile twice.
+    global _congestion
+    base = (snap or snapshot).base_graph
+    entries = schedule.entries()
+    key = (base, schedule.version)
+    cached = _congestion
+    if cached[0] != key:
+        cached = (key, build_congestion_profile(base, entries, METERS_PER_PIXEL))
+        _congestion = cached
+    return cached[1]
+
+def congestion_bin(at=None):
+    # The week bin the congestion profile uses for a departure at `at`
+    current = time(at)
+    return week_bin(current["weekday"], current["hour"] * 60 + current["minute"])
+
+_availability = (None, None)  # ((base graph, schedule version), AvailabilityIndex)
+
+def availability_index(snap=None):
+    # Busy map rooms by time; rebuilt only when the map or the schedule changes
+    global _availability
+    base = (snap or snapshot).base_graph
+    entries = schedule.entries()
+    key = (base, schedule.version)
+    cached = _availability
+    if cached[0] != key:
+        rooms = [name for i, name in enumerate(base.names) if base.node_type(i) == "room"]
+        cached = (key, AvailabilityIndex(entries, rooms))
+        _availability = cached
+    return cached[1]
+
+def nearest(start, node_types=None, name=None, free=False, k=5, mode="normal", at=None):
+    """The `k` destinations closest to `start` by travel time.
+
+    Candidates can be limited to some node types, to names containing `name`
+    (case-insensitive, e.g. "toilet"), and with `free` to rooms from the
+    schedule with no lecture at `at` (default now). Returns a list of dicts
+    with name, type, floor, time_seconds, distance_meters and path, nearest
+    first. Raises ValueError for an unknown start node.
+    """
+    snap = snapshot
+    g = snap.graph
+    if start not in g.index:
+        raise ValueError(f"Invalid node name: {start}")
+
+    current = time(at)
+    scheduled = None
+    if free:
+        # Free rooms are the scheduled ones (not toilets, labs...) with no lecture now
+        node_types = node_types or ("room",)
+        availability = availability_index(snap)
+        scheduled = availability.rooms
+        busy = availability.busy(DAY_NAMES.get(current["weekday"], "Unknown"),
+                                 current["hour"] * 60 + current["minute"])
+    else:
+        busy = frozenset()
+    needle = name.lower() if name else None
 
-    return None, float('inf'), float('inf')
+    source = g.index[start]
+    matches = set()
+    for i, node in enumerate(g.names):
+        if i == source or not is_destination(node, g) or node in busy:
+            continue
+        if scheduled is not None and node not in scheduled:
+            continue
+        if node_types and g.node_type(i) not in node_types:
+            continue
+        if needle and needle not in node.lower():
+            continue
+        matches.add(i)
+
+    weights = g.weights(mode, is_break_time(current["hour"]))
+    found, parent = nearest_matches(g, source, weights, matches, k)
+    return [{
+        "name": g.names[i],
+        "type": g.node_type(i),
+        "floor": g.floor[i],
+        "time_seconds": total_time,
+        "distance_meters": total_dist,
+        "path": walk_parents(g, parent, source, i),
+    } for i, total_time, total_dist in found]
+
+# Multi-stop itineraries: one shortest-path tree per distinct stop serves
+# every leg, and doubles as the travel time table for reordering stops
+
+def group_lectures(group, day):
+    # (start, end, entry) for a group's lectures on a day, by start time. Of
+    # overlapping lectures (the group split over rooms) the one starting
+    # first is kept, ties going to the one listed first. Back-to-back
+    # lectures (one starting as the previous ends) don't overlap.
+    lectures = []
+    for order, entry in enumerate(schedule.entries()):
+        if str(entry.get("group", "")) != str(group) or entry.get("day") != day:
+            continue
+        try:
+            start = parse_minutes(entry.get("start", "00:00"))
+            end = parse_minutes(entry.get("end", "00:00"))
+        except ValueError:
+            continue
+        lectures.append((start, order, end, entry))
+    lectures.sort(key=lambda lecture: lecture[:2])
+    kept = []
+    for start, _, end, entry in lectures:
+        if not kept or start >= kept[-1][1]:
+            kept.append((start, end, entry))
+    return kept
+
+def lecture_node(room, g):
+    # The map room a schedule room refers to (exact name, else the longest
+    # map room name it contains), or None
+    room = str(room)
+    if room in g.index:
+        return room
+    rooms = [name for i, name in enumerate(g.names) if g.node_type(i) == "room" and name in room]
+    return max(rooms, key=len) if rooms else None
+
+def plan_itinerary(stops=(), group=None, start=None, end=None, mode="normal", at=None, reorder=False):
+    """Route through a day's stops, checking arrival against lecture times.
+
+    `stops` are node names, positions or {"node", "time": "HH:MM"} dicts
+    (arrive by `time`); `group` adds that group's lectures on the day of `at`
+    (default now). Without `reorder`, stops are visited as start, lectures,
+    `stops` in the given order, end. With it, lectures and timed stops keep
+    their time order and the other stops are fitted in where they add the
+    least walking (cheapest insertion plus 2-opt). Raises ValueError for
+    unknown stops or an unreachable leg.
+    """
+    snap = snapshot
+    g = snap.graph
+    departure = at if at is not None else datetime.now()
+    day = DAY_NAMES[departure.weekday()]
+
+    def clock(minutes):
+        return departure.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
+
+    # Each stop: (node, deadline minutes or None, lecture end minutes or None, lecture entry)
+    visits = []
+    unmatched = []
+    if group is not None:
+        for lecture_start, lecture_end, entry in group_lectures(group, day):
+            node = lecture_node(entry.get("room", ""), g)
+            if node is None:
+                unmatched.append(str(entry.get("room", "")))
+            else:
+                visits.append((node, lecture_start, lecture_end, entry))
+    for stop in stops:
+        deadline = None
+        if isinstance(stop, dict) and "node" in stop:
+            if stop.get("time"):
+                deadline = parse_minutes(stop["time"])
+            stop = stop["node"]
+        node = resolve_location(stop, snap)
+        if node not in g.index:
+            raise ValueError(f"Invalid stop: {stop}")
+        visits.append((node, deadline, None, None))
+
+    first = [(resolve_location(start, snap), None, None, None)] if start is not None else []
+    last = [(resolve_location(end, snap), None, None, None)] if end is not None else []
+    for node, _, _, _ in first + last:
+        if node not in g.index:
+            raise ValueError(f"Invalid start or end: {node}")
+    visits = first + visits + last
+    if len(visits) < 2:
+        raise ValueError("An itinerary needs at least two stops")
+
+    ids = sorted({g.index[node] for node, _, _, _ in visits})
+    column = {node_id: k for k, node_id in enumerate(ids)}
+    trees = {}
+
+    def tree_table(is_break):
+        # {source id: (times, dists, parent)} over the stop nodes, built per regime on demand
+        if is_break not in trees:
+            rows = shortest_path_trees(g, ids, mode, is_break, targets=ids, with_parents=True,
+                                       workers=1)
+            trees[is_break] = dict(zip(ids, rows))
+        return trees[is_break]
+
+    order = list(range(len(visits)))
+    if reorder:
+        table = tree_table(is_break_time(departure.hour))
+        cost = [[table[g.index[a[0]]][0][column[g.index[b[0]]]] for b in visits] for a in visits]
+        timed = sorted((i for i in order[len(first):len(visits) - len(last)] if visits[i][1] is not None),
+                       key=lambda i: (visits[i][1], i))
+        anchors = order[:len(first)] + timed + order[len(visits) - len(last):]
+        free = [i for i in order if i not in anchors]
+        order = two_opt(cost, cheapest_insertion(cost, anchors, free, open_start=not first,
+                                                    open_end=not last), anchors)
+
+    legs = []
+    timeline = []
+    now = departure
+    total_time = total_dist = 0.0
+    late_stops = 0
+    for position, i in enumerate(order):
+        node, deadline, lecture_end, entry = visits[i]
+        if position:
+            previous = visits[order[position - 1]][0]
+            source, target = g.index[previous], g.index[node]
+            times, dists, parent = tree_table(is_break_time(now.hour))[source]
+            leg_time, leg_dist = times[column[target]], dists[column[target]]
+            if leg_time == math.inf:
+                raise ValueError(f"No path from {previous} to {node}")
+            arrival = now + timedelta(seconds=leg_time)
+            legs.append({
+                "from": previous,
+                "to": node,
+                "path": walk_parents(g, parent, source, target),
+                "time_seconds": leg_time,
+                "distance_meters": leg_dist,
+                "depart": now.strftime("%H:%M"),
+                "arrive": arrival.strftime("%H:%M"),
+            })
+            total_time += leg_time
+            total_dist += leg_dist
+            now = arrival
+
+        stop = {"node": node, "arrive": now.strftime("%H:%M")}
+        if deadline is not None:
+            lateness = (now - clock(deadline)).total_seconds() / 60
+            stop.update(deadline=clock(deadline).strftime("%H:%M"), late=lateness > 0,
+                        late_minutes=max(lateness, 0.0), slack_minutes=max(-lateness, 0.0))
+            late_stops += lateness > 0
+        if entry is not None:
+            stop["course"] = entry.get("course")
+            # Stay for the lecture, unless it is already over
+            now = max(now, clock(lecture_end))
+        stop["depart"] = now.strftime("%H:%M")
+        timeline.append(stop)
 
+    return {
+        "day": day,
+        "stops": timeline,
+        "legs": legs,
+        "total_time_seconds": total_time,
+        "total_distance_meters": total_dist,
+        "late_stops": late_stops,
+        "unmatched_rooms": unmatched,
+    }
 
 def show_Current_Time():
 
@@ -223,206 +933,130 @@ def show_Current_Time():
         18: "6 PM", 19: "7 PM", 20: "8 PM", 21: "9 PM", 22: "10 PM", 23: "11 PM"
     }
 
-    Days = {
-        0: "Monday", 1: "Tuesday", 2: "Wednesday", 3: "Thursday",
-        4: "Friday", 5: "Saturday", 6: "Sunday"
-    }
     # Fetch fresh values
     current = time()
     current_hour = current["hour"]
     current_weekday = current["weekday"]
 
-    return Days.get(current_weekday, "Unknown"), Hours.get(current_hour, "Unknown"), current["minute"]
+    return DAY_NAMES.get(current_weekday, "Unknown"), Hours.get(current_hour, "Unknown"), current["minute"]
 
 def check_room_status(target_room):
     if node_types.get(target_room) == "department" or node_types.get(target_room) == "corridor":
         return
     else:
         
-        # Get readable day/hour and numeric time values
-        day_name, hour_label = show_Current_Time()
-        current = time()
-        current_hour = current["hour"]
-        current_minute = current["minute"]
-
-        # Try to find schedule.json in here or parent dir
-        here = os.path.dirname(__file__)
-        file_name = os.path.join(here, "schedule.json")
-        if not os.path.exists(file_name):
-            file_name = os.path.join(here, "..", "schedule.json")
-
-        if not os.path.exists(file_name):
+        # Get readable day/hour values
+        day_name, hour_label, _ = show_Current_Time()
+
+        if not schedule.available:
             print(f"❌ Error: schedule.json file not found.")
             return
 
-        with open(file_name, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        if isinstance(data, dict) and "schedule" in data:
-            schedule_data = data["schedule"]
-        else:
-            schedule_data = data
-
         print(f"\n🔎 Checking schedule for room: {target_room} on {(day_name, hour_label)}...")
         
-        found_lecture = False
-        
-        current_time_minutes = (current_hour * 60) + current_minute
-
-        for course in schedule_data:
-            room_in_json = str(course.get("room", "")) 
-            day_in_json = course.get("day", "")
-            
-            
-            if target_room in room_in_json and day_in_json == day_name:
-                
-                start_str = course.get("start", "00:00")
-                end_str = course.get("end", "00:00")
-
-                try:
-                    start_h, start_m = map(int, start_str.split(":"))
-                    end_h, end_m = map(int, end_str.split(":"))
-                    
-                    lecture_start_minutes = (start_h * 60) + start_m
-                    lecture_end_minutes = (end_h * 60) + end_m
-
-                    if lecture_start_minutes <= current_time_minutes <= lecture_end_minutes:
-                        print(f"\n Room is BUSY (Occupied)!")
-                        print(f"   Course:     {course.get('course', 'Unknown')}")
-                        print(f"   Instructor: {course.get('instructor', 'Unknown')}")
-                        print(f"   Group:      {course.get('group', 'Unknown')}")
-                        print(f"   Time:       {start_str} - {end_str}")
-                        found_lecture = True
-                        break 
-                except ValueError:
-                    continue 
-
-        if not found_lecture:
+        course = room_occupancy(target_room)
+
+        if course:
+            print(f"\n Room is BUSY (Occupied)!")
+            print(f"   Course:     {course.get('course', 'Unknown')}")
+            print(f"   Instructor: {course.get('instructor', 'Unknown')}")
+            print(f"   Group:      {course.get('group', 'Unknown')}")
+            print(f"   Time:       {course.get('start', '00:00')} - {course.get('end', '00:00')}")
+        else:
             print(f"\n Room {target_room} is currently EMPTY. You can use it.")
 
-def search_schedule(query):
-    # Try to find schedule.json in here or parent dir
-    here = os.path.dirname(__file__)
-    file_name = os.path.join(here, "schedule.json")
-    if not os.path.exists(file_name):
-        file_name = os.path.join(here, "..", "schedule.json")
-
-    if not os.path.exists(file_name):
-        return []
-
-    with open(file_name, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    schedule_data = data.get("schedule", []) if isinstance(data, dict) else data
-    
-    results = []
-    query = query.lower()
-    for entry in schedule_data:
-        course = entry.get("course", "").lower()
-        instructor = entry.get("instructor", "")
-        instructor_str = instructor.lower() if instructor else ""
-        room = entry.get("room", "").lower()
-        
-        if query in course or query in instructor_str or query in room:
-            results.append(entry)
-            
+def search_schedule(query, limit=None, offset=0):
+    # Ranked token/prefix matches over course, room and instructor
+    _, results = schedule_index.search(query, limit, offset)
     return results
 
-def generate_directions(path):
+def classify_turn(turn):
+    # `turn` is the change in bearing between two steps, in [-180, 180)
+    if -45 <= turn <= 45:
+        return "Continue straight"
+    elif 45 < turn <= 135:
+        return "Turn RIGHT"
+    elif -135 <= turn < -45:
+        return "Turn LEFT"
+    return "Turn AROUND"
+
+def generate_directions(path, snap=None):
+    # `snap` should be the snapshot the route was found on
     if not path or len(path) < 2:
         return []
-
-
-    def describe_node(node):
-        node_type = node_types.get(node, "corridor")
-        if node_type in ["room", "department"]:
-            return node
+    if snap is None:
+        snap = snapshot
+
+    # Bearings, distances and nearby places are precomputed with the graph.
+    # The base graph still has any edge closed since the route was found.
+    g = snap.base_graph
+    ids = [g.index[node] for node in path]
+    edges = [g.edge_index(a, b) for a, b in zip(ids, ids[1:])]
+    floors = [g.floor[i] for i in ids]
+    types = [g.node_type(i) for i in ids]
+    places = [g.names[p] if p != -1 else None for p in (g.nearby_place[i] for i in ids)]
+    bearings = [g.edge_bearing[e] for e in edges]
+
+    # Whole-path turn classification: a step only has a turn if it and the
+    # step before it both stay on one floor
+    flat = [floors[i] == floors[i + 1] for i in range(len(edges))]
+    moves = [None] + [
+        classify_turn((bearings[i] - bearings[i - 1] + 180) % 360 - 180)
+        if flat[i] and flat[i - 1] else None
+        for i in range(1, len(edges))
+    ]
+
+    def describe_node(k):
+        if types[k] in ["room", "department"]:
+            return path[k]
         return "the corridor"
 
+    directions = [f"Start at {describe_node(0)}"]
+    straight = None  # (meters, last place ahead) of the current straight run
 
-    def get_nearby_place(node):
-        for n in connections.get(node, []):
-            if node_types.get(n) in ["room", "department"]:
-                return n
-        return None
-
-    directions = [f"Start at {describe_node(path[0])}"]
-    previous_angle = None
-
-    for i in range(len(path) - 1):
-        current = path[i]
-        next_node = path[i + 1]
-
-        x1, y1 = node_coordinates[current]
-        x2, y2 = node_coordinates[next_node]
+    def end_straight_run():
+        meters, place = straight
+        where = f"towards {place}" if place else "along the corridor"
+        directions.append(f"Continue straight for {meters:.0f} m {where}")
 
-        floor_current = node_floors.get(current, 0)
-        floor_next = node_floors.get(next_node, 0)
-
-        type_current = node_types.get(current, "corridor")
-        type_next = node_types.get(next_node, "corridor")
-
-        target = describe_node(next_node)
-        place_ahead = get_nearby_place(next_node)
+    for i in range(len(edges)):
+        place_ahead = places[i + 1]
 
+        # Consecutive straight steps become one instruction with a distance
+        if moves[i] == "Continue straight":
+            meters, place = straight or (0.0, None)
+            straight = (meters + g.edge_dist[edges[i]], place_ahead or place)
+            continue
+        if straight:
+            end_straight_run()
+            straight = None
 
-        if floor_current != floor_next:
+        if not flat[i]:
+            type_current, type_next = types[i], types[i + 1]
+            floor_next = floors[i + 1]
             if type_current == "stairs" or type_next == "stairs":
-                direction = "UP" if floor_next > floor_current else "DOWN"
+                direction = "UP" if floor_next > floors[i] else "DOWN"
                 directions.append(f"Take the stairs {direction} to floor {floor_next}")
             elif type_current == "elevator" or type_next == "elevator":
                 directions.append(f"Take the elevator to floor {floor_next}")
 
-
             if type_next not in ["stairs", "elevator"]:
-                directions.append(f"Exit and head towards {target}")
-
-            previous_angle = None
-            continue
-
-
-        dx = x2 - x1
-        dy = y2 - y1
-        current_angle = math.degrees(math.atan2(dy, dx))
-        if current_angle < 0:
-            current_angle += 360
-
-
-        if previous_angle is None:
+                directions.append(f"Exit and head towards {describe_node(i + 1)}")
+        elif moves[i] is None:
             if place_ahead:
                 directions.append(f"Walk forward (you'll pass near {place_ahead})")
             else:
                 directions.append("Walk forward along the corridor")
-
-            previous_angle = current_angle
-            continue
-
-
-        turn = current_angle - previous_angle
-        while turn > 180:
-            turn -= 360
-        while turn < -180:
-            turn += 360
-
-        if -45 <= turn <= 45:
-            move = "Continue straight"
-        elif 45 < turn <= 135:
-            move = "Turn RIGHT"
-        elif -135 <= turn < -45:
-            move = "Turn LEFT"
+        elif place_ahead:
+            directions.append(f"{moves[i]} towards {place_ahead}")
         else:
-            move = "Turn AROUND"
-
-        if place_ahead:
-            directions.append(f"{move} towards {place_ahead}")
-        else:
-            directions.append(f"{move} along the corridor")
-
-        previous_angle = current_angle
+            directions.append(f"{moves[i]} along the corridor")
 
+    if straight:
+        end_straight_run()
 
     final = path[-1]
-    final_type = node_types.get(final, "corridor")
+    final_type = types[-1]
 
     if final_type == "room":
         directions.append(f"🎯 You have arrived at room {final}")
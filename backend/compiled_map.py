@@ -0,0 +1,156 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+
+from map_graph import MODES, REGIMES, CompiledGraph
+
+
+# --- Compiled Map Files ---
+# The compiled graph, saved in a flat binary layout that loads without
+# parsing: every array is a memoryview straight into a read-only mmap, so
+# pages are only read when a search touches them and worker processes that
+# open the same file share them through the page cache. Only the node names
+# are decoded, for the name -> id index.
+#
+# File layout (little endian, every section padded to 8 bytes):
+#   header        magic, version, sha256 of the map JSON, sha256 of the edge
+#                 cost parameters, crc32 of everything after the header,
+#                 node/edge counts, name/type-name byte lengths
+#   names         utf-8, "\0" separated
+#   type names    utf-8, "\0" separated
+#   x, y          float64[node_count]
+#   floor         int32[node_count]
+#   type code     uint8[node_count]
+#   nearby place  int32[node_count]
+#   offsets       int32[node_count + 1]
+#   targets       int32[edge_count]
+#   dist          float64[edge_count]
+#   bearing       float64[edge_count]
+#   time          float64[edge_count] per (mode, is_break), MODES x REGIMES order
+#
+# A file is stale when the map JSON or the cost parameters it was compiled
+# with have changed; load_compiled_map returns None and the caller falls back
+# to compiling the JSON.
+
+MAGIC = b"CMAPGRPH"
+VERSION = 1
+HEADER = struct.Struct("<8sHxx32s32sIIIII")
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "college_map.bin")
+
+
+def _padding(size):
+    return -size % 8
+
+
+def params_digest(cost_params):
+    return hashlib.sha256(cost_params.encode("utf-8")).hexdigest()
+
+
+def _sections(graph):
+    names = "\0".join(graph.names).encode("utf-8")
+    type_names = "\0".join(graph.type_names).encode("utf-8")
+    sections = [names, type_names, graph.x, graph.y, graph.floor, graph.type_code,
+                graph.nearby_place, graph.offsets, graph.targets, graph.edge_dist,
+                graph.edge_bearing]
+    sections.extend(graph.edge_time[(mode, is_break)] for mode in MODES for is_break in REGIMES)
+    return len(names), len(type_names), sections
+
+
+def save_compiled_map(graph, map_hash, cost_params, path=DEFAULT_PATH):
+    names_size, types_size, sections = _sections(graph)
+    body = bytearray()
+    for section in sections:
+        data = bytes(section)
+        body += data
+        body += b"\0" * _padding(len(data))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bytes.fromhex(map_hash),
+                            bytes.fromhex(params_digest(cost_params)), zlib.crc32(body),
+                            graph.node_count, graph.edge_count, names_size, types_size))
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def load_compiled_map(path=DEFAULT_PATH, map_hash=None, cost_params=None, verify=True):
+    """Memory-map a compiled map. Returns None if missing, corrupt or stale.
+
+    `verify` checks the payload checksum, which reads the whole file once.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # empty file
+
+    if len(buffer) < HEADER.size:
+        return None
+    (magic, version, digest, params, checksum,
+     node_count, edge_count, names_size, types_size) = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if map_hash is not None and digest.hex() != map_hash:
+        return None
+    if cost_params is not None and params.hex() != params_digest(cost_params):
+        return None
+
+    n, m = node_count, edge_count
+    layout = ([('B', names_size, 1), ('B', types_size, 1),
+               ('d', n, 8), ('d', n, 8), ('i', n, 4), ('B', n, 1), ('i', n, 4),
+               ('i', n + 1, 4), ('i', m, 4), ('d', m, 8), ('d', m, 8)] +
+              [('d', m, 8)] * (len(MODES) * len(REGIMES)))
+    expected = HEADER.size + sum(count * size + _padding(count * size) for _, count, size in layout)
+    if len(buffer) != expected:
+        return None
+
+    view = memoryview(buffer)
+    if verify and zlib.crc32(view[HEADER.size:]) != checksum:
+        return None
+
+    offset = HEADER.size
+    sections = []
+    for fmt, count, itemsize in layout:
+        size = count * itemsize
+        sections.append(view[offset:offset + size].cast(fmt))
+        offset += size + _padding(size)
+
+    names_bytes, types_bytes, xs, ys, floors, type_codes, nearby_place, \
+        offsets, targets, edge_dist, edge_bearing = sections[:11]
+    names = bytes(names_bytes).decode("utf-8").split("\0") if n else []
+    type_names = tuple(bytes(types_bytes).decode("utf-8").split("\0")) if types_size else ()
+    times = iter(sections[11:])
+    edge_time = {(mode, is_break): next(times) for mode in MODES for is_break in REGIMES}
+
+    # The memoryviews keep the mmap open for as long as the graph is alive
+    return CompiledGraph(names, xs, ys, floors, type_codes, type_names,
+                         offsets, targets, edge_dist, edge_time, edge_bearing, nearby_place)
+
+
+if __name__ == "__main__":
+    import json
+
+    import college_map_core as map_logic
+    from map_graph import compile_graph
+
+    parser = argparse.ArgumentParser(description="Compile the map JSON into a binary map file.")
+    parser.add_argument("map", nargs="?", help="map JSON file (default: college_map_data.json)")
+    parser.add_argument("-o", "--output", default=DEFAULT_PATH, help="output file")
+    args = parser.parse_args()
+
+    map_path = args.map or map_logic.find_map_file()
+    if not map_path or not os.path.exists(map_path):
+        raise SystemExit("Error: Map data file 'college_map_data.json' not found.")
+    with open(map_path, "rb") as f:
+        raw = f.read()
+
+    graph = compile_graph(json.loads(raw.decode("utf-8")), map_logic.edge_time_cost,
+                          map_logic.METERS_PER_PIXEL)
+    save_compiled_map(graph, hashlib.sha256(raw).hexdigest(), map_logic.cost_params(), args.output)
+    print(f"Compiled {graph.node_count} nodes and {graph.edge_count} edges into {args.output}")
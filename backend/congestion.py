@@ -0,0 +1,114 @@
+import math
+from array import array
+
+from map_graph import best_first, parent_path
+from schedule_store import DAY_NAMES, parse_minutes
+
+
+# --- Time-Dependent Congestion ---
+# Corridors fill up around rooms whose lectures just ended (and, less, just
+# before one starts). The schedule is turned once into per-zone slowdown
+# profiles binned over the week; a zone is the area around one scheduled room
+# on its floor. At search time a walking edge costs
+#     base time * (1 + profile[zone of its tail][bin of the time we reach it])
+# so the search only does an array lookup per edge, never schedule logic.
+# Edges between floors (stairs, elevator rides) keep their fixed times.
+
+BIN_MINUTES = 10
+BINS_PER_WEEK = 7 * 24 * 60 // BIN_MINUTES
+CROWD_RADIUS_M = 25           # meters around a room that get crowded
+CROWD_AFTER_END_MINUTES = 15  # corridors stay busy this long after a lecture
+CROWD_BEFORE_START_MINUTES = 10
+SLOWDOWN_AFTER_END = 0.6      # extra fraction of walking time per ending lecture
+SLOWDOWN_BEFORE_START = 0.3
+MAX_SLOWDOWN = 2.0
+
+WEEKDAYS = {name: day for day, name in DAY_NAMES.items()}
+
+
+def week_bin(weekday, minute_of_day):
+    return (weekday * 1440 + minute_of_day) // BIN_MINUTES % BINS_PER_WEEK
+
+
+class CongestionProfile:
+    def __init__(self, zone, profiles, rooms):
+        self.zone = zone            # array('h'), node id -> zone index or -1
+        self.profiles = profiles    # per zone: array('d') slowdown per week bin
+        self.rooms = rooms          # zone index -> room name
+
+    def slowdown(self, node, bin_index):
+        z = self.zone[node]
+        return self.profiles[z][bin_index] if z >= 0 else 0.0
+
+
+def build_congestion_profile(graph, entries, meters_per_pixel):
+    # One zone per scheduled room that exists on the map
+    rooms = []
+    zone_of_room = {}
+    for entry in entries:
+        room = str(entry.get("room", ""))
+        if room in graph.index and room not in zone_of_room:
+            zone_of_room[room] = len(rooms)
+            rooms.append(room)
+
+    profiles = [array('d', bytes(8 * BINS_PER_WEEK)) for _ in rooms]
+    for entry in entries:
+        z = zone_of_room.get(str(entry.get("room", "")))
+        weekday = WEEKDAYS.get(entry.get("day", ""))
+        if z is None or weekday is None:
+            continue
+        try:
+            start = parse_minutes(entry.get("start", "00:00"))
+            end = parse_minutes(entry.get("end", "00:00"))
+        except ValueError:
+            continue
+
+        profile = profiles[z]
+        windows = ((end, end + CROWD_AFTER_END_MINUTES, SLOWDOWN_AFTER_END),
+                   (start - CROWD_BEFORE_START_MINUTES, start, SLOWDOWN_BEFORE_START))
+        for first, last, slowdown in windows:
+            for minute in range(first, last, BIN_MINUTES):
+                b = week_bin(weekday, minute)
+                profile[b] = min(profile[b] + slowdown, MAX_SLOWDOWN)
+
+    # Every node near a scheduled room (same floor) joins the nearest one's zone
+    radius_px = CROWD_RADIUS_M / meters_per_pixel
+    zone = array('h', [-1] * graph.node_count)
+    nearest = [math.inf] * graph.node_count
+    for room, z in zone_of_room.items():
+        r = graph.index[room]
+        rx, ry, floor = graph.x[r], graph.y[r], graph.floor[r]
+        for i in range(graph.node_count):
+            if graph.floor[i] != floor:
+                continue
+            d = math.hypot(graph.x[i] - rx, graph.y[i] - ry)
+            if d <= radius_px and d < nearest[i]:
+                nearest[i] = d
+                zone[i] = z
+
+    return CongestionProfile(zone, profiles, rooms)
+
+
+def time_dependent_search(graph, source, target, weights, heuristic, profile, start_minute_of_week):
+    """A* where every edge is slowed by the congestion at the time it is reached.
+
+    `heuristic` must be a lower bound on uncongested travel time; congestion
+    only ever adds time, so it stays admissible. Returns (node-id path,
+    total_time, total_distance, expanded nodes).
+    """
+    adj, floor = graph.targets, graph.floor
+    zone, profiles = profile.zone, profile.profiles
+
+    def congested(node, current_time, e):
+        # Crowds only slow walking, not stair climbs or elevator rides
+        z = zone[node]
+        if z < 0 or floor[adj[e]] != floor[node]:
+            return weights[e]
+        b = int(start_minute_of_week + current_time / 60) // BIN_MINUTES % BINS_PER_WEEK
+        return weights[e] * (1 + profiles[z][b])
+
+    g_time, g_dist, parent, found, expanded, _ = best_first(graph, source, weights, heuristic, target,
+                                                           cost=congested)
+    if found == -1:
+        return None, math.inf, math.inf, expanded
+    return parent_path(parent, target), g_time[target], g_dist[target], expanded
@@ -0,0 +1,49 @@
+import gzip
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+
+# --- Pre-encoded Responses ---
+# JSON bodies that only change when the map reloads are encoded and
+# compressed once, and served with an ETag / Last-Modified pair so clients
+# that already have them get a 304.
+
+class EncodedResponse:
+    def __init__(self, payload, last_modified):
+        self.body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.brotli_body = brotli.compress(self.body) if brotli else None
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.last_modified_ts = int(last_modified)
+        self.last_modified = formatdate(self.last_modified_ts, usegmt=True)
+
+    def not_modified(self, headers):
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if_none_match = headers.get("If-None-Match")
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+            return "*" in tags or self.etag in tags
+
+        if_modified_since = headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.last_modified_ts
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def body_for(self, accept_encoding):
+        """Return (body, Content-Encoding or None) for an Accept-Encoding header."""
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        if self.brotli_body is not None and "br" in accepted:
+            return self.brotli_body, "br"
+        if "gzip" in accepted:
+            return self.gzip_body, "gzip"
+        return self.body, None
@@ -0,0 +1,60 @@
+import math
+
+
+# --- Itinerary Ordering ---
+# A day's stops are either anchored (the start, each lecture in time order,
+# the end) or free to visit whenever (library, cafe...). Free stops are placed
+# by cheapest insertion between consecutive stops and the order is then
+# polished with 2-opt moves that never move an anchor. Costs come from one
+# precomputed stop x stop travel time table, so no extra searches are run.
+
+def _tour_cost(cost, order):
+    return sum(cost[a][b] for a, b in zip(order, order[1:]))
+
+
+def cheapest_insertion(cost, anchors, free, open_start=True, open_end=True):
+    """Insert each free stop where it adds the least travel time.
+
+    Free stops only go before the first anchor if `open_start` is set (the
+    day has no fixed start stop), and only after the last one if `open_end`
+    is set (no fixed end stop).
+    """
+    order = list(anchors)
+    # Stops far from every anchor first: they constrain the tour the most
+    pending = sorted(free, key=lambda s: -min((cost[a][s] for a in anchors), default=0))
+    for stop in pending:
+        if not order:
+            order.append(stop)
+            continue
+        candidates = []
+        if open_start:
+            candidates.append((cost[stop][order[0]], 0))
+        for i in range(len(order) - 1):
+            a, b = order[i], order[i + 1]
+            candidates.append((cost[a][stop] + cost[stop][b] - cost[a][b], i + 1))
+        if open_end or not candidates:
+            candidates.append((cost[order[-1]][stop], len(order)))
+        # Ties go to the earliest position
+        _, position = min(candidates)
+        order.insert(position, stop)
+    return order
+
+
+def two_opt(cost, order, anchors):
+    """Reverse runs of free stops while that shortens the tour."""
+    anchors = set(anchors)
+    best = _tour_cost(cost, order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order)):
+            for j in range(i + 1, len(order)):
+                if order[j] in anchors or order[i] in anchors:
+                    break
+                # Costs are directed, so the whole tour is re-summed
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                candidate_cost = _tour_cost(cost, candidate)
+                if candidate_cost < best - 1e-9:
+                    order, best = candidate, candidate_cost
+                    improved = True
+    return order
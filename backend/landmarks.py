@@ -0,0 +1,116 @@
+import math
+import threading
+from array import array
+
+from map_graph import MODES, dijkstra
+
+
+# --- Landmark (ALT) Heuristic ---
+# A few landmarks (stair and elevator nodes, spread across floors) get exact
+# travel times to and from every node. By the triangle inequality
+#     d(v, t) >= d(L, t) - d(L, v)   and   d(v, t) >= d(v, L) - d(t, L)
+# so the best of those bounds over all landmarks is an admissible, consistent
+# heuristic. Tables are built with the off-break edge times, which are never
+# higher than the break ones, so one table per mode covers both regimes.
+
+DEFAULT_LANDMARKS = 8
+
+
+def select_landmarks(graph, count=DEFAULT_LANDMARKS):
+    """Pick stair/elevator nodes far apart from each other (farthest-first)."""
+    candidates = [i for i in range(graph.node_count)
+                  if graph.node_type(i) in ("stairs", "elevator")]
+    if not candidates:
+        candidates = list(range(graph.node_count))
+    if not candidates:
+        return []
+
+    def spread(a, b):
+        dx = graph.x[a] - graph.x[b]
+        dy = graph.y[a] - graph.y[b]
+        # A floor counts like a long corridor so shafts on every floor get picked
+        return math.sqrt(dx*dx + dy*dy) + 1000 * abs(graph.floor[a] - graph.floor[b])
+
+    chosen = [min(candidates, key=lambda i: (graph.floor[i], graph.x[i], graph.y[i]))]
+    nearest = {i: spread(i, chosen[0]) for i in candidates}
+    while len(chosen) < min(count, len(candidates)):
+        best = max(candidates, key=lambda i: nearest[i])
+        if nearest[best] == 0:
+            break
+        chosen.append(best)
+        for i in candidates:
+            nearest[i] = min(nearest[i], spread(i, best))
+    return chosen
+
+
+class LandmarkTable:
+    def __init__(self, landmarks, node_count, from_landmark, to_landmark):
+        self.landmarks = landmarks        # landmark node ids
+        self.node_count = node_count
+        self.from_landmark = from_landmark  # array('d'), [k * n + v] = d(L_k, v)
+        self.to_landmark = to_landmark      # array('d'), [k * n + v] = d(v, L_k)
+
+    def target_terms(self, target):
+        """Per-landmark (row offset, d(L, t), d(t, L)) for one query target.
+
+        Landmarks that can't reach or be reached from the target give no bound.
+        """
+        n = self.node_count
+        terms = []
+        for k in range(len(self.landmarks)):
+            base = k * n
+            terms.append((base, self.from_landmark[base + target], self.to_landmark[base + target]))
+        return terms
+
+    def bound(self, terms, node):
+        best = 0.0
+        inf = math.inf
+        from_landmark, to_landmark = self.from_landmark, self.to_landmark
+        for base, from_target, to_target in terms:
+            from_node = from_landmark[base + node]
+            if from_target != inf and from_node != inf and from_target - from_node > best:
+                best = from_target - from_node
+            to_node = to_landmark[base + node]
+            if to_node != inf and to_target != inf and to_node - to_target > best:
+                best = to_node - to_target
+        return best
+
+
+def build_landmarks(graph, mode, landmarks):
+    weights = graph.weights(mode, False)
+    reverse = graph.reversed()
+    reverse_weights = reverse.weights(mode, False)
+
+    from_landmark = array('d')
+    to_landmark = array('d')
+    for landmark in landmarks:
+        g_time, _, _ = dijkstra(graph, landmark, weights)
+        from_landmark.extend(g_time)
+        g_time, _, _ = dijkstra(reverse, landmark, reverse_weights)
+        to_landmark.extend(g_time)
+    return LandmarkTable(landmarks, graph.node_count, from_landmark, to_landmark)
+
+
+class Landmarks:
+    """Per-mode landmark tables for one graph, built on first use.
+
+    Safe to share between threads; a table is only ever built once.
+    """
+
+    def __init__(self, graph, count=DEFAULT_LANDMARKS):
+        self.graph = graph
+        self.landmarks = select_landmarks(graph, count)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def table(self, mode):
+        if mode not in MODES:
+            mode = "normal"
+        table = self._tables.get(mode)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(mode)
+                if table is None:
+                    table = build_landmarks(self.graph, mode, self.landmarks)
+                    self._tables[mode] = table
+        return table
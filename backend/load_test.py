@@ -0,0 +1,111 @@
+import argparse
+import json
+import math
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+# --- Load Test ---
+# Fires random /api/path requests between destinations at a running server,
+# at increasing numbers of concurrent clients, and reports throughput and
+# tail latency per level. Needs nothing beyond the standard library.
+#
+#   python backend/load_test.py --url http://127.0.0.1:5000 -c 1 4 16 64
+#
+# Pairs are seeded, so with the route cache on, later levels mostly measure
+# cache hits; use --unique for a fresh pair per request (or run the server
+# with ROUTE_CACHE_SIZE=0) to load the search itself.
+
+SEED = 1234
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = math.floor(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def fetch_destinations(url):
+    with urllib.request.urlopen(url + "/api/nodes?format=compact", timeout=30) as response:
+        data = json.load(response)
+    name = data["fields"].index("name")
+    return [node[name] for node in data["nodes"]]
+
+
+def post_path(url, start, end, mode, engine, timeout):
+    body = json.dumps({"start": start, "end": end, "mode": mode, "engine": engine}).encode("utf-8")
+    request = urllib.request.Request(url + "/api/path", data=body,
+                                     headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return time.perf_counter() - t0, status
+
+
+def run_level(url, pairs, concurrency, mode, engine, timeout):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda pair: post_path(url, pair[0], pair[1], mode, engine, timeout), pairs))
+        total = time.perf_counter() - start
+
+    # 404 (no path) is a valid answer; anything else is an error
+    ms = sorted(latency * 1000 for latency, status in results if status in (200, 404))
+    errors = sum(1 for _, status in results if status not in (200, 404))
+    return {
+        "concurrency": concurrency,
+        "requests": len(pairs),
+        "errors": errors,
+        "rps": len(ms) / total if total else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1] if ms else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test /api/path at increasing concurrency.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="server base URL")
+    parser.add_argument("-c", "--concurrency", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32],
+                        help="concurrent clients per level")
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests per level")
+    parser.add_argument("--mode", default="normal")
+    parser.add_argument("--engine", default="astar")
+    parser.add_argument("--unique", action="store_true", help="draw new pairs for every level")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    destinations = fetch_destinations(url)
+    rng = random.Random(SEED)
+
+    def draw_pairs():
+        return [tuple(rng.sample(destinations, 2)) for _ in range(args.requests)]
+
+    pairs = draw_pairs()
+    levels = []
+    print(f"{'clients':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for concurrency in args.concurrency:
+        if args.unique and levels:
+            pairs = draw_pairs()
+        level = run_level(url, pairs, concurrency, args.mode, args.engine, args.timeout)
+        levels.append(level)
+        print(f"{concurrency:>8} {level['rps']:>9.1f} {level['p50_ms']:>9.2f} "
+              f"{level['p95_ms']:>9.2f} {level['p99_ms']:>9.2f} {level['errors']:>7}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "mode": args.mode, "engine": args.engine, "levels": levels}, f, indent=2)
@@ -0,0 +1,127 @@
+import argparse
+import json
+import random
+
+
+# --- Synthetic Campus Maps ---
+# Writes maps in the same schema as college_map_data.json
+# ({name: {x, y, type, floor, neighbors: [{name}]}}) for scale testing:
+# several buildings side by side, each with N floors of corridor grid, rooms
+# along the corridors, dead-end spurs, stair and elevator shafts linking
+# adjacent floors, and outdoor paths between the ground-floor entrances.
+
+NODE_SPACING = 40     # pixels between corridor nodes
+ROW_SPACING = 120     # pixels between parallel corridors
+ROOM_OFFSET = 18      # pixels from a corridor node to its room door
+BUILDING_GAP = 300    # pixels of outdoor space between buildings
+
+
+def generate_map(buildings=3, floors=5, corridors=3, corridor_length=20, room_ratio=0.6,
+                 stairs=2, elevators=1, dead_ends=3, seed=0):
+    rng = random.Random(seed)
+    nodes = {}
+
+    def add(name, x, y, node_type, floor):
+        nodes[name] = {"x": x, "y": y, "type": node_type, "floor": floor, "neighbors": []}
+        return name
+
+    def link(a, b):
+        nodes[a]["neighbors"].append({"name": b})
+        nodes[b]["neighbors"].append({"name": a})
+
+    width = (corridor_length - 1) * NODE_SPACING
+    entrances = []
+
+    for b in range(buildings):
+        x0 = 100 + b * (width + BUILDING_GAP)
+        y0 = 100
+
+        # Shaft columns are fixed per building so every floor lines up
+        columns = rng.sample(range(corridor_length), min(stairs + elevators, corridor_length))
+        stair_columns = columns[:stairs]
+        elevator_columns = columns[stairs:]
+
+        for f in range(floors):
+            grid = [[None] * corridor_length for _ in range(corridors)]
+            for r in range(corridors):
+                y = y0 + r * ROW_SPACING
+                for i in range(corridor_length):
+                    grid[r][i] = add(f"B{b}_F{f}_point_{r}_{i}", x0 + i * NODE_SPACING, y, "corridor", f)
+                    if i:
+                        link(grid[r][i - 1], grid[r][i])
+                    if r:
+                        # Cross corridors at both ends and in the middle
+                        if i in (0, corridor_length // 2, corridor_length - 1):
+                            link(grid[r - 1][i], grid[r][i])
+
+                    if rng.random() < room_ratio:
+                        side = 1 if rng.random() < 0.5 else -1
+                        room = add(f"B{b}-{f}-{r}{i:02d}", x0 + i * NODE_SPACING,
+                                   y + side * ROOM_OFFSET, "room", f)
+                        link(grid[r][i], room)
+
+            # Dead-end spurs hanging off random corridor nodes
+            for d in range(dead_ends):
+                r = rng.randrange(corridors)
+                i = rng.randrange(corridor_length)
+                previous = grid[r][i]
+                for k in range(1, rng.randint(2, 4)):
+                    spur = add(f"B{b}_F{f}_spur_{d}_{k}", x0 + i * NODE_SPACING + k * 10,
+                               y0 + r * ROW_SPACING - k * NODE_SPACING // 2, "corridor", f)
+                    link(previous, spur)
+                    previous = spur
+
+            for s, i in enumerate(stair_columns):
+                name = add(f"B{b}-Stairs{s}-F{f}", x0 + i * NODE_SPACING + 10,
+                           y0 + corridors * ROW_SPACING - ROW_SPACING // 2, "stairs", f)
+                link(grid[corridors - 1][i], name)
+                if f:
+                    link(f"B{b}-Stairs{s}-F{f - 1}", name)
+
+            for e, i in enumerate(elevator_columns):
+                name = add(f"B{b}-Elevator{e}-F{f}", x0 + i * NODE_SPACING - 10,
+                           y0 + corridors * ROW_SPACING - ROW_SPACING // 2, "elevator", f)
+                link(grid[corridors - 1][i], name)
+                if f:
+                    link(f"B{b}-Elevator{e}-F{f - 1}", name)
+
+            if f == 0:
+                entrance = add(f"B{b}-Entrance", x0 - NODE_SPACING, y0, "department", 0)
+                link(entrance, grid[0][0])
+                entrances.append(entrance)
+
+    # Outdoor paths between neighbouring buildings' entrances
+    for b in range(1, len(entrances)):
+        a, c = nodes[entrances[b - 1]], nodes[entrances[b]]
+        previous = entrances[b - 1]
+        steps = 4
+        for k in range(1, steps):
+            outdoor = add(f"Outdoor_point_{b}_{k}", a["x"] + (c["x"] - a["x"]) * k // steps,
+                          a["y"] - 60, "corridor", 0)
+            link(previous, outdoor)
+            previous = outdoor
+        link(previous, entrances[b])
+
+    return nodes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic campus map for scale testing.")
+    parser.add_argument("-o", "--output", required=True, help="map JSON file to write")
+    parser.add_argument("--buildings", type=int, default=3)
+    parser.add_argument("--floors", type=int, default=5)
+    parser.add_argument("--corridors", type=int, default=3, help="parallel corridors per floor")
+    parser.add_argument("--corridor-length", type=int, default=20, help="nodes per corridor")
+    parser.add_argument("--room-ratio", type=float, default=0.6, help="chance of a room per corridor node")
+    parser.add_argument("--stairs", type=int, default=2, help="stair shafts per building")
+    parser.add_argument("--elevators", type=int, default=1, help="elevator shafts per building")
+    parser.add_argument("--dead-ends", type=int, default=3, help="dead-end spurs per floor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--indent", type=int, default=None, help="pretty-print with this indent")
+    args = parser.parse_args()
+
+    map_data = generate_map(args.buildings, args.floors, args.corridors, args.corridor_length,
+                            args.room_ratio, args.stairs, args.elevators, args.dead_ends, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(map_data, f, indent=args.indent)
+    print(f"Wrote {len(map_data)} nodes to {args.output}")
@@ -0,0 +1,476 @@
+import heapq
+import math
+from array import array
+from collections.abc import Mapping
+
+
+# --- Compiled Map Graph ---
+# The map JSON is compiled once at load time into integer node ids and
+# CSR-style adjacency arrays (offsets/targets) with the per-edge distance and
+# the per-edge walking time for every (mode, is_break) combination already
+# evaluated. The search engines only ever touch these flat arrays. Edge
+# bearings and each node's nearby room are kept alongside for directions.
+
+MODES = ("normal", "stairs", "wheelchair")
+REGIMES = (False, True)  # is_break
+
+
+class CompiledGraph:
+    def __init__(self, names, xs, ys, floors, type_codes, type_names,
+                 offsets, targets, edge_dist, edge_time, edge_bearing, nearby_place):
+        self.names = names                  # id -> node name
+        self.index = {name: i for i, name in enumerate(names)}  # node name -> id
+        self.x = xs                         # array('d')
+        self.y = ys                         # array('d')
+        self.floor = floors                 # array('i')
+        self.type_code = type_codes         # array('B'), index into type_names
+        self.type_names = type_names        # tuple of type strings
+        self.offsets = offsets              # array('i'), len = node_count + 1
+        self.targets = targets              # array('i'), neighbor ids
+        self.edge_dist = edge_dist          # array('d'), meters per edge
+        self.edge_time = edge_time          # {(mode, is_break): array('d')} seconds per edge
+        self.edge_bearing = edge_bearing    # array('d'), degrees in [0, 360) per edge
+        self.nearby_place = nearby_place    # array('i'), first adjacent room/department or -1
+        self._reversed = None
+
+    def __getstate__(self):
+        # Graphs loaded from a compiled map file hold memoryviews into its mmap,
+        # which can't be pickled (spawned worker processes); send copies instead
+        def plain(value):
+            return array(value.format, value.tobytes()) if isinstance(value, memoryview) else value
+
+        state = {key: plain(value) for key, value in self.__dict__.items()}
+        state["edge_time"] = {key: plain(times) for key, times in self.edge_time.items()}
+        state["_reversed"] = None
+        return state
+
+    @property
+    def node_count(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def node_type(self, node_id):
+        return self.type_names[self.type_code[node_id]]
+
+    def weights(self, mode, is_break):
+        # Unknown modes behave like "normal", as they always have
+        if mode not in MODES:
+            mode = "normal"
+        return self.edge_time[(mode, bool(is_break))]
+
+    def neighbors(self, node_id):
+        return range(self.offsets[node_id], self.offsets[node_id + 1])
+
+    def without(self, closed_nodes=(), closed_edges=()):
+        """A copy with the given node ids and (a, b) id pairs made impassable.
+
+        Closed nodes lose all their edges; an edge pair closes both directions.
+        Node ids stay the same, so per-node tables built on this graph remain
+        valid lookups on the copy.
+        """
+        closed_nodes = set(closed_nodes)
+        closed_pairs = set()
+        for a, b in closed_edges:
+            closed_pairs.add((a, b))
+            closed_pairs.add((b, a))
+
+        offsets = array('i', [0])
+        targets = array('i')
+        keep = []
+        for a in range(self.node_count):
+            if a not in closed_nodes:
+                for e in range(self.offsets[a], self.offsets[a + 1]):
+                    b = self.targets[e]
+                    if b not in closed_nodes and (a, b) not in closed_pairs:
+                        targets.append(b)
+                        keep.append(e)
+            offsets.append(len(targets))
+
+        edge_dist = array('d', (self.edge_dist[e] for e in keep))
+        edge_time = {key: array('d', (times[e] for e in keep))
+                     for key, times in self.edge_time.items()}
+        edge_bearing = array('d', (self.edge_bearing[e] for e in keep))
+        # Nearby places stay as on the full map; a closed door is still a landmark
+        return CompiledGraph(self.names, self.x, self.y, self.floor, self.type_code,
+                             self.type_names, offsets, targets, edge_dist, edge_time,
+                             edge_bearing, self.nearby_place)
+
+    def has_edge(self, a, b):
+        return self.edge_index(a, b) != -1
+
+    def edge_index(self, a, b):
+        """Position of the a -> b edge in the edge arrays, or -1."""
+        for e in range(self.offsets[a], self.offsets[a + 1]):
+            if self.targets[e] == b:
+                return e
+        return -1
+
+    def reversed(self):
+        """The same graph with every edge flipped (for searches towards a node)."""
+        if self._reversed is None:
+            n = self.node_count
+            counts = [0] * (n + 1)
+            for b in self.targets:
+                counts[b + 1] += 1
+            offsets = array('i', counts)
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+
+            m = self.edge_count
+            slot = list(offsets[:n])
+            order = [0] * m   # reversed edge position -> original edge index
+            sources = array('i', [0] * m)
+            for a in range(n):
+                for e in range(self.offsets[a], self.offsets[a + 1]):
+                    b = self.targets[e]
+                    order[slot[b]] = e
+                    sources[slot[b]] = a
+                    slot[b] += 1
+
+            edge_dist = array('d', (self.edge_dist[e] for e in order))
+            edge_time = {key: array('d', (times[e] for e in order))
+                         for key, times in self.edge_time.items()}
+            edge_bearing = array('d', ((self.edge_bearing[e] + 180) % 360 for e in order))
+            self._reversed = CompiledGraph(self.names, self.x, self.y, self.floor,
+                                           self.type_code, self.type_names,
+                                           offsets, sources, edge_dist, edge_time,
+                                           edge_bearing, self.nearby_place)
+        return self._reversed
+
+    # Read-only dict views keeping the old module-level API working
+    def coordinates_view(self):
+        return _CoordinatesView(self)
+
+    def connections_view(self):
+        return _ConnectionsView(self)
+
+    def types_view(self):
+        return _TypesView(self)
+
+    def floors_view(self):
+        return _FloorsView(self)
+
+
+def compile_graph(map_data, edge_time_cost, meters_per_pixel):
+    """Build a CompiledGraph from the parsed map JSON.
+
+    `edge_time_cost(type_a, type_b, floor_a, floor_b, dist_m, mode, is_break)`
+    returns the walking time in seconds for a single edge.
+    """
+    names = list(map_data)
+    index = {name: i for i, name in enumerate(names)}
+
+    xs = array('d')
+    ys = array('d')
+    floors = array('i')
+    type_codes = array('B')
+    type_lookup = {}
+    for name in names:
+        data = map_data[name]
+        xs.append(data["x"])
+        ys.append(data["y"])
+        floors.append(data.get("floor", 0))
+        node_type = data.get("type", "corridor")
+        if node_type not in type_lookup:
+            type_lookup[node_type] = len(type_lookup)
+        type_codes.append(type_lookup[node_type])
+    type_names = tuple(type_lookup)
+
+    offsets = array('i', [0])
+    targets = array('i')
+    edge_dist = array('d')
+    edge_bearing = array('d')
+    edge_time = {(mode, is_break): array('d') for mode in MODES for is_break in REGIMES}
+    nearby_place = array('i', [-1] * len(names))
+    place_codes = {type_lookup[t] for t in ("room", "department") if t in type_lookup}
+
+    for a, name in enumerate(names):
+        neighbors = map_data[name].get("neighbors", [])
+        for n in neighbors:
+            neighbor = n["name"] if isinstance(n, dict) else n
+            b = index.get(neighbor)
+            if b is None:
+                continue  # dangling reference, unreachable anyway
+
+            dx = xs[b] - xs[a]
+            dy = ys[b] - ys[a]
+            dist_m = math.sqrt(dx*dx + dy*dy) * meters_per_pixel
+
+            bearing = math.degrees(math.atan2(dy, dx))
+            if bearing < 0:
+                bearing += 360
+
+            targets.append(b)
+            edge_dist.append(dist_m)
+            edge_bearing.append(bearing)
+            if nearby_place[a] == -1 and type_codes[b] in place_codes:
+                nearby_place[a] = b
+            for (mode, is_break), times in edge_time.items():
+                times.append(edge_time_cost(
+                    type_names[type_codes[a]], type_names[type_codes[b]],
+                    floors[a], floors[b], dist_m, mode, is_break))
+        offsets.append(len(targets))
+
+    return CompiledGraph(names, xs, ys, floors, type_codes, type_names,
+                         offsets, targets, edge_dist, edge_time, edge_bearing, nearby_place)
+
+
+class _GraphView(Mapping):
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __iter__(self):
+        return iter(self._graph.names)
+
+    def __len__(self):
+        return self._graph.node_count
+
+    def __contains__(self, name):
+        return name in self._graph.index
+
+    def __getitem__(self, name):
+        return self._value(self._graph.index[name])
+
+
+class _CoordinatesView(_GraphView):
+    def _value(self, i):
+        x, y = self._graph.x[i], self._graph.y[i]
+        return (int(x) if x.is_integer() else x, int(y) if y.is_integer() else y)
+
+
+class _ConnectionsView(_GraphView):
+    def _value(self, i):
+        g = self._graph
+        return [g.names[g.targets[e]] for e in g.neighbors(i)]
+
+
+class _TypesView(_GraphView):
+    def _value(self, i):
+        return self._graph.node_type(i)
+
+
+class _FloorsView(_GraphView):
+    def _value(self, i):
+        return self._graph.floor[i]
+
+
+# --- Single-source search ---
+def best_first(graph, source, weights, heuristic=None, target=-1, stop=None, cost=None,
+               budget=math.inf):
+    """The search loop shared by every single-source search: Dijkstra, or A*
+    given a `heuristic` (node id -> lower bound on the time left).
+
+    Heap entries are (priority, discovery order, node id): ties go to the node
+    discovered first, same as the old linear scan, and undiscovered nodes are
+    always pushed, even at an infinite cost.
+
+    The search ends once `target` is settled, once `stop(node, time)` returns
+    True for a settled node, or after `budget` expansions. `cost(node, time,
+    e)`, if given, is the time to take edge `e` out of `node` when reached at
+    `time`, in place of `weights[e]`.
+
+    Returns (g_time, g_dist, parent, node the search stopped at or -1,
+    expanded, relaxed); parent is -1 for the source and unreached nodes.
+    """
+    n = graph.node_count
+    offsets, adj, edge_dist = graph.offsets, graph.targets, graph.edge_dist
+
+    g_time = [math.inf] * n
+    g_dist = [math.inf] * n
+    parent = [-1] * n
+    g_time[source] = 0
+    g_dist[source] = 0
+
+    discovered = [-1] * n
+    discovered[source] = 0
+    discovered_count = 1
+    heap = [(heuristic(source) if heuristic else 0, 0, source)]
+    closed = bytearray(n)
+    expanded = relaxed = 0
+
+    while heap and expanded < budget:
+        _, _, node = heapq.heappop(heap)
+        if closed[node]:
+            continue  # stale entry left behind by a cheaper push
+        closed[node] = 1
+        expanded += 1
+
+        current_time = g_time[node]
+        if node == target or (stop is not None and stop(node, current_time)):
+            return g_time, g_dist, parent, node, expanded, relaxed
+
+        current_dist = g_dist[node]
+        for e in range(offsets[node], offsets[node + 1]):
+            neighbor = adj[e]
+            if closed[neighbor]:
+                continue
+
+            if cost is None:
+                new_g_time = current_time + weights[e]
+            else:
+                new_g_time = current_time + cost(node, current_time, e)
+            if discovered[neighbor] != -1 and not new_g_time < g_time[neighbor]:
+                continue
+
+            g_time[neighbor] = new_g_time
+            g_dist[neighbor] = current_dist + edge_dist[e]
+            parent[neighbor] = node
+            relaxed += 1
+            if discovered[neighbor] == -1:
+                discovered[neighbor] = discovered_count
+                discovered_count += 1
+            if heuristic is None:
+                heapq.heappush(heap, (new_g_time, discovered[neighbor], neighbor))
+            else:
+                heapq.heappush(heap, (new_g_time + heuristic(neighbor), discovered[neighbor], neighbor))
+
+    return g_time, g_dist, parent, -1, expanded, relaxed
+
+
+def parent_path(parent, node):
+    """The node-id path from the search source to `node` along a parent list."""
+    path = []
+    while node != -1:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def dijkstra(graph, source, weights, targets=None):
+    """Shortest travel times from `source` (node id) over the given edge weights.
+
+    Returns (g_time, g_dist, parent) lists indexed by node id; parent is -1 for
+    the source and for unreached nodes. If `targets` (a set of node ids) is
+    given, the search stops as soon as all of them are settled.
+    """
+    stop = None
+    if targets is not None:
+        remaining = set(targets)
+
+        def stop(node, _):
+            remaining.discard(node)
+            return not remaining
+
+    g_time, g_dist, parent, _, _, _ = best_first(graph, source, weights, stop=stop)
+    return g_time, g_dist, parent
+
+
+def walk_parents(graph, parent, source, target):
+    """Rebuild the node-name path from `source` to `target` along a parent tree."""
+    if target != source and parent[target] == -1:
+        return None
+    return [graph.names[i] for i in parent_path(parent, target)]
+
+
+def nearest_matches(graph, source, weights, matches, k):
+    """The `k` nodes in `matches` (a set of node ids) closest to `source`.
+
+    One Dijkstra that stops as soon as the k-th match is settled; nodes are
+    settled in order of travel time, so these are exactly the k closest.
+    Returns ([(node id, time, distance)] nearest first, parent list).
+    """
+    if k <= 0:
+        return [], [-1] * graph.node_count
+    found = []
+
+    def stop(node, time):
+        if time == math.inf:
+            return True  # everything left is only reachable through impassable edges
+        if node in matches:
+            found.append(node)
+        return len(found) >= k
+
+    g_time, g_dist, parent, _, _, _ = best_first(graph, source, weights, stop=stop)
+    return [(node, g_time[node], g_dist[node]) for node in found], parent
+
+
+# --- Bidirectional search ---
+def bidirectional_dijkstra(graph, source, target, weights, reverse_weights):
+    """Shortest path by growing one search from `source` and one towards `target`.
+
+    The backward search runs on graph.reversed(), whose edges carry the time of
+    the original directed edge, so asymmetric costs are respected. Returns
+    (node-id path, total_time, total_distance), or (None, inf, inf) when the
+    two searches can't meet at a finite cost.
+    """
+    if source == target:
+        return [source], 0, 0
+
+    reverse = graph.reversed()
+    n = graph.node_count
+    inf = math.inf
+
+    # index 0 = forward (from source), 1 = backward (towards target)
+    sides = []
+    for g, start, w in ((graph, source, weights), (reverse, target, reverse_weights)):
+        g_time = [inf] * n
+        g_dist = [inf] * n
+        parent = [-1] * n
+        g_time[start] = 0
+        g_dist[start] = 0
+        sides.append({
+            "graph": g, "weights": w, "g_time": g_time, "g_dist": g_dist, "parent": parent,
+            "heap": [(0, 0, start)], "closed": bytearray(n), "order": 1,
+        })
+
+    best = inf
+    meet = -1
+
+    while sides[0]["heap"] and sides[1]["heap"]:
+        # Stop once no undiscovered path can beat the best meeting point
+        if sides[0]["heap"][0][0] + sides[1]["heap"][0][0] >= best:
+            break
+
+        # Expand the side with the smaller frontier
+        k = 0 if len(sides[0]["heap"]) <= len(sides[1]["heap"]) else 1
+        side, other = sides[k], sides[1 - k]
+        current_time, _, node = heapq.heappop(side["heap"])
+        if side["closed"][node]:
+            continue
+        side["closed"][node] = 1
+
+        g = side["graph"]
+        weights_k = side["weights"]
+        g_time, g_dist, parent = side["g_time"], side["g_dist"], side["parent"]
+        other_time = other["g_time"]
+        for e in range(g.offsets[node], g.offsets[node + 1]):
+            neighbor = g.targets[e]
+            new_g_time = current_time + weights_k[e]
+            if new_g_time < g_time[neighbor]:
+                g_time[neighbor] = new_g_time
+                g_dist[neighbor] = g_dist[node] + g.edge_dist[e]
+                parent[neighbor] = node
+                heapq.heappush(side["heap"], (new_g_time, side["order"], neighbor))
+                side["order"] += 1
+            if other_time[neighbor] != inf and g_time[neighbor] + other_time[neighbor] < best:
+                best = g_time[neighbor] + other_time[neighbor]
+                meet = neighbor
+
+    if meet == -1:
+        return None, inf, inf
+
+    forward, backward = sides
+    path = []
+    node = meet
+    while node != -1:
+        path.append(node)
+        node = forward["parent"][node]
+    path.reverse()
+    node = backward["parent"][meet]
+    while node != -1:
+        path.append(node)
+        node = backward["parent"][node]
+
+    # Re-add the costs front to back so the sums round exactly like a_star's
+    total_time = total_dist = 0
+    for a, b in zip(path, path[1:]):
+        for e in range(graph.offsets[a], graph.offsets[a + 1]):
+            if graph.targets[e] == b:
+                total_time += weights[e]
+                total_dist += graph.edge_dist[e]
+                break
+    return path, total_time, total_dist
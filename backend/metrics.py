@@ -0,0 +1,173 @@
+import bisect
+import cProfile
+import math
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+
+# --- Request Metrics ---
+# In-process counters, gauges and histograms rendered in the Prometheus text
+# exposition format, so /metrics can be scraped without any external client
+# library. Each server process keeps its own numbers; under a multi-worker
+# server scrape every worker (or run a single worker) to see them all.
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}         # name -> (type, help, buckets or None)
+        self._values = {}       # (name, labels) -> number, for counters and gauges
+        self._histograms = {}   # (name, labels) -> [per-bucket counts, sum, count]
+
+    def describe(self, name, kind, help_text, buckets=DEFAULT_BUCKETS):
+        """Declare a metric; `kind` is "counter", "gauge" or "histogram"."""
+        self._meta[name] = (kind, help_text, tuple(buckets) if kind == "histogram" else None)
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name, value, **labels):
+        buckets = self._meta[name][2]
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: (list(counts), total, count)
+                          for key, (counts, total, count) in self._histograms.items()}
+
+        lines = []
+        for name in sorted(self._meta):
+            kind, help_text, buckets = self._meta[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(buckets + (math.inf,), counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_label_text(labels + (('le', _number(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_label_text(labels)} {_number(total)}")
+                    lines.append(f"{name}_count{_label_text(labels)} {count}")
+            else:
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def span(spans, stage):
+    """Add the time spent in the block to spans[stage] (seconds)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans[stage] = spans.get(stage, 0.0) + time.perf_counter() - t0
+
+
+# --- Slow Request Profiling ---
+# Opt-in: a sampled fraction of requests runs under cProfile, and the ones
+# slower than the threshold are dumped as pstats files
+# (python -m pstats <file>, or snakeviz). Off while threshold_ms is None.
+# Only the newest `max_files` dumps are kept in the directory, so a low
+# threshold can't fill the disk.
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms=None, sample_rate=1.0, directory=None, max_files=200):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.directory = directory or os.path.join(os.path.dirname(__file__), "profiles")
+        self.max_files = max_files
+        self.dumped = 0
+
+    @property
+    def enabled(self):
+        return self.threshold_ms is not None
+
+    def start(self):
+        """A running profiler for this request, or None if it isn't sampled."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None  # another request on this process is already being profiled
+        return profiler
+
+    def finish(self, profiler, elapsed, label):
+        """Stop `profiler`; returns the dump path if the request was slow."""
+        if profiler is None:
+            return None
+        profiler.disable()
+        elapsed_ms = elapsed * 1000
+        if self.threshold_ms is None or elapsed_ms < self.threshold_ms:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:60]
+        path = os.path.join(self.directory,
+                            f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{slug}_{elapsed_ms:.0f}ms.prof")
+        profiler.dump_stats(path)
+        self.dumped += 1
+        self._prune()
+        return path
+
+    def _prune(self):
+        # Other worker processes may share the directory, so go by what is on disk
+        dumps = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith(".prof")]
+        if len(dumps) <= self.max_files:
+            return
+        dumps.sort(key=lambda dump: os.path.getmtime(dump) if os.path.exists(dump) else 0)
+        for dump in dumps[:len(dumps) - self.max_files]:
+            try:
+                os.remove(dump)
+            except OSError:
+                pass  # already pruned by another worker
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+from array import array
+
+from map_graph import dijkstra
+
+
+# --- Parallel Routing Driver ---
+# Runs one Dijkstra per source node across a process pool. The compiled graph
+# is handed to the workers once by the pool initializer: with the "fork" start
+# method it is inherited read-only from the parent, otherwise (Windows, macOS
+# "spawn") it is pickled once per worker, never once per task. Sources are
+# split into contiguous chunks and results come back in input order.
+#
+# Only pool workers keep the graph in a module global; the parent never sets
+# it, so concurrent callers in one process can't see each other's graph.
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _solve_chunk(task, graph=None):
+    sources, mode, is_break, targets, with_parents = task
+    if graph is None:
+        graph = _worker_graph
+    weights = graph.weights(mode, is_break)
+    target_set = set(targets) if targets is not None else None
+
+    rows = []
+    for source in sources:
+        g_time, g_dist, parent = dijkstra(graph, source, weights, targets=target_set)
+        if targets is not None:
+            g_time = [g_time[t] for t in targets]
+            g_dist = [g_dist[t] for t in targets]
+        rows.append((array('d', g_time), array('d', g_dist),
+                     array('i', parent) if with_parents else None))
+    return rows
+
+
+def default_workers():
+    return int(os.environ.get("ROUTING_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def shortest_path_trees(graph, sources, mode="normal", is_break=False, targets=None,
+                        workers=None, with_parents=False):
+    """Dijkstra from every source node id, optionally across worker processes.
+
+    Returns one (times, distances, parent) tuple per source, in source order.
+    `times`/`distances` cover `targets` (node ids, in order) or every node if
+    `targets` is None; `parent` is the full tree if `with_parents` is set.
+    """
+    sources = list(sources)
+    targets = list(targets) if targets is not None else None
+    workers = min(workers or default_workers(), len(sources))
+
+    if workers <= 1:
+        return _solve_chunk((sources, mode, is_break, targets, with_parents), graph)
+
+    # A few chunks per worker keeps them busy when searches differ in cost
+    chunk_count = workers * 4
+    size = -(-len(sources) // chunk_count)
+    tasks = [(sources[i:i + size], mode, is_break, targets, with_parents)
+             for i in range(0, len(sources), size)]
+
+    # Forked workers inherit the initializer arguments without pickling them
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    with context.Pool(workers, initializer=_init_worker, initargs=(graph,)) as pool:
+        chunks = pool.map(_solve_chunk, tasks)
+
+    return [row for chunk in chunks for row in chunk]
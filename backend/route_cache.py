@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# --- Route Response Cache ---
+# Bounded LRU of fully encoded /api/path responses keyed by
+# (start, end, mode, is_break, engine). Entries expire after `ttl` seconds
+# and the whole cache is dropped whenever the loaded map changes. Each entry
+# remembers the nodes on its route, so closing a node or corridor only drops
+# the routes that pass through it.
+#
+# Invalidations record the map version (snapshot.version) they were made
+# for, and a put from a search that ran on an older version is refused:
+# otherwise a search still running when a node closes could cache its route
+# through the node after the closure has already dropped the old entries.
+
+class RouteCache:
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, body bytes, route nodes)
+        self._lock = threading.Lock()
+        self._map_version = None
+        self._version = None            # newest map version an invalidation was made for
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def bind(self, map_version):
+        """Clear the cache if the map it was filled from has been replaced."""
+        with self._lock:
+            if map_version != self._map_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._map_version = map_version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, body, _ = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body, nodes=(), version=None):
+        """Store a response; `version` is the map version it was computed on."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version is not None and self._version is not None and version < self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, body, frozenset(nodes))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _advance(self, version):
+        if version is not None and (self._version is None or version > self._version):
+            self._version = version
+
+    def invalidate_nodes(self, nodes, all_of=False, version=None):
+        """Drop the routes passing through any (or, with `all_of`, every) node
+        in `nodes`; returns how many were dropped. `version` is the map
+        version the change produced; older puts are refused from now on."""
+        nodes = frozenset(nodes)
+        if all_of:
+            hit = nodes.issubset
+        else:
+            hit = lambda route: not nodes.isdisjoint(route)
+        with self._lock:
+            self._advance(version)
+            stale = [key for key, (_, _, route) in self._entries.items() if hit(route)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self, version=None):
+        with self._lock:
+            self._advance(version)
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,187 @@
+import argparse
+import mmap
+import os
+import struct
+from array import array
+
+from compiled_map import params_digest
+from map_graph import MODES, REGIMES
+from parallel_routing import shortest_path_trees
+
+
+# --- Precomputed Route Tables ---
+# For every (mode, is_break) pair we run one Dijkstra per destination node and
+# keep its shortest-path tree, so any destination -> destination route is a
+# walk along parent pointers instead of a fresh search.
+#
+# File layout (little endian, every section padded to 8 bytes):
+#   header   magic, version, sha256 of the map JSON, sha256 of the edge cost
+#            parameters, node/destination/table counts
+#   dests    int32[dest_count]                    destination node ids
+#   per table, in MODES x REGIMES order:
+#     parent int32[dest_count * node_count]       parent node id per source row
+#     time   float64[dest_count * dest_count]     seconds, source row -> dest col
+#     dist   float64[dest_count * dest_count]     meters, source row -> dest col
+#
+# Like a compiled map, a table is stale when the map JSON or the cost
+# parameters (college_map_core.cost_params) it was built with have changed.
+
+MAGIC = b"CMAPRTBL"
+VERSION = 2
+HEADER = struct.Struct("<8sHxx32s32sIII")
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "route_table.bin")
+
+
+def _padding(size):
+    return -size % 8
+
+
+def table_size(node_count, dest_count):
+    """About how many bytes a table for this many nodes and destinations takes."""
+    per_table = dest_count * node_count * 4 + dest_count * dest_count * 16
+    return HEADER.size + dest_count * 4 + per_table * len(MODES) * len(REGIMES)
+
+
+class RouteTable:
+    def __init__(self, map_hash, params, node_count, dests, tables, buffer=None):
+        self.map_hash = map_hash            # hex sha256 of the map JSON it was built from
+        self.params = params                # hex sha256 of the cost parameters it was built with
+        self.node_count = node_count
+        self.dests = dests                  # int32 destination node ids
+        self.row = {node: i for i, node in enumerate(dests)}  # node id -> row/col
+        self.tables = tables                # {(mode, is_break): (parent, time, dist)}
+        self._buffer = buffer               # keeps the mmap alive when loaded from disk
+
+    def lookup(self, graph, start, goal, mode, is_break):
+        """Return (path, total_time, total_distance), or None if not covered."""
+        source_row = self.row.get(graph.index.get(start))
+        goal_col = self.row.get(graph.index.get(goal))
+        if source_row is None or goal_col is None:
+            return None
+
+        if mode not in MODES:
+            mode = "normal"
+        parent, times, dists = self.tables[(mode, bool(is_break))]
+
+        base = source_row * self.node_count
+        node = self.dests[goal_col]
+        source = self.dests[source_row]
+        if node != source and parent[base + node] == -1:
+            return None, float('inf'), float('inf')
+
+        path = []
+        while node != -1:
+            path.append(graph.names[node])
+            node = parent[base + node]
+        path.reverse()
+
+        cell = source_row * len(self.dests) + goal_col
+        return path, times[cell], dists[cell]
+
+
+def build_route_table(graph, destinations, map_hash, cost_params, workers=1):
+    dests = array('i', sorted(graph.index[name] for name in destinations))
+    n = graph.node_count
+
+    tables = {}
+    for mode in MODES:
+        for is_break in REGIMES:
+            parent = array('i')
+            times = array('d')
+            dists = array('d')
+            trees = shortest_path_trees(graph, dests, mode, is_break, targets=dests,
+                                        workers=workers, with_parents=True)
+            for tree_times, tree_dists, tree in trees:
+                parent.extend(tree)
+                times.extend(tree_times)
+                dists.extend(tree_dists)
+            tables[(mode, is_break)] = (parent, times, dists)
+
+    return RouteTable(map_hash, params_digest(cost_params), n, dests, tables)
+
+
+def save_route_table(table, path=DEFAULT_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bytes.fromhex(table.map_hash), bytes.fromhex(table.params),
+                            table.node_count, len(table.dests), len(table.tables)))
+        sections = [table.dests]
+        for key in ((mode, is_break) for mode in MODES for is_break in REGIMES):
+            sections.extend(table.tables[key])
+        for section in sections:
+            data = section.tobytes()
+            f.write(data)
+            f.write(b"\0" * _padding(len(data)))
+    os.replace(tmp_path, path)
+
+
+def load_route_table(path=DEFAULT_PATH, map_hash=None, cost_params=None):
+    """Memory-map a saved table. Returns None if missing, corrupt or stale."""
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # empty file
+
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, digest, params, node_count, dest_count, table_count = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or table_count != len(MODES) * len(REGIMES):
+        return None
+    if map_hash is not None and digest.hex() != map_hash:
+        return None
+    if cost_params is not None and params.hex() != params_digest(cost_params):
+        return None
+
+    expected = HEADER.size
+    for count, itemsize in ([(dest_count, 4)] +
+                            [(dest_count * node_count, 4), (dest_count * dest_count, 8),
+                             (dest_count * dest_count, 8)] * table_count):
+        expected += count * itemsize + _padding(count * itemsize)
+    if len(buffer) != expected:
+        return None
+
+    view = memoryview(buffer)
+    offset = HEADER.size
+
+    def section(fmt, count, itemsize):
+        nonlocal offset
+        size = count * itemsize
+        data = view[offset:offset + size].cast(fmt)
+        offset += size + _padding(size)
+        return data
+
+    dests = section('i', dest_count, 4)
+    tables = {}
+    for mode in MODES:
+        for is_break in REGIMES:
+            tables[(mode, is_break)] = (
+                section('i', dest_count * node_count, 4),
+                section('d', dest_count * dest_count, 8),
+                section('d', dest_count * dest_count, 8),
+            )
+
+    return RouteTable(digest.hex(), params.hex(), node_count, dests, tables, buffer)
+
+
+if __name__ == "__main__":
+    import college_map_core as map_logic
+
+    parser = argparse.ArgumentParser(description="Precompute the route tables for the map.")
+    parser.add_argument("map", nargs="?", help="map JSON file (default: college_map_data.json)")
+    parser.add_argument("-o", "--output", default=DEFAULT_PATH, help="output file")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: ROUTING_WORKERS or CPU count)")
+    args = parser.parse_args()
+
+    if not map_logic.load_map_data(args.map):
+        raise SystemExit(1)
+
+    destinations = map_logic.destination_nodes()
+    table = build_route_table(map_logic.base_graph, destinations, map_logic.map_data_hash,
+                              map_logic.cost_params(), args.workers)
+    save_route_table(table, args.output)
+    print(f"Saved route tables for {len(destinations)} destinations to {args.output}")
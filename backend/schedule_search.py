@@ -0,0 +1,102 @@
+import re
+import threading
+from bisect import bisect_left
+
+
+# --- Schedule Search Index ---
+# Inverted index over the normalized tokens of each entry's course, room and
+# instructor. Query tokens match whole tokens or token prefixes (found by
+# bisecting the sorted vocabulary), so search-as-you-type needs no scan over
+# the schedule. The index is rebuilt whenever the ScheduleStore reloads.
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Field weights used for ranking, best match first
+FIELDS = (("course", 3), ("room", 2), ("instructor", 1))
+EXACT_BONUS = 2
+PREFIX_BONUS = 1
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class ScheduleSearchIndex:
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = None
+        # (entries, token -> {entry id: field weight}, sorted tokens for prefix
+        #  ranges, lowercased fields per entry for the substring fallback),
+        # swapped as one so a concurrent search never mixes two schedules
+        self._index = ([], {}, [], [])
+
+    def _refresh(self):
+        entries = self.store.entries()
+        if self._version == self.store.version:
+            return
+        with self._lock:
+            if self._version == self.store.version:
+                return
+            self._build(entries, self.store.version)
+
+    def _build(self, entries, version):
+        postings = {}
+        haystacks = []
+        for i, entry in enumerate(entries):
+            texts = []
+            for field, weight in FIELDS:
+                text = str(entry.get(field) or "")
+                texts.append(text.lower())
+                for token in tokenize(text):
+                    ids = postings.setdefault(token, {})
+                    ids[i] = max(ids.get(i, 0), weight)
+            haystacks.append(texts)
+
+        self._index = (entries, postings, sorted(postings), haystacks)
+        self._version = version
+
+    def _match_token(self, postings, vocabulary, token):
+        # entry id -> best score for a single query token
+        scores = {}
+        i = bisect_left(vocabulary, token)
+        while i < len(vocabulary) and vocabulary[i].startswith(token):
+            bonus = EXACT_BONUS if vocabulary[i] == token else PREFIX_BONUS
+            for entry_id, weight in postings[vocabulary[i]].items():
+                score = weight * bonus
+                if score > scores.get(entry_id, 0):
+                    scores[entry_id] = score
+            i += 1
+        return scores
+
+    def search(self, query, limit=None, offset=0):
+        """Return (total, results) for entries matching every query token.
+
+        Results are ranked by score (exact beats prefix, course beats room
+        beats instructor) and then by schedule order. Queries that don't
+        tokenize into a match fall back to plain substring matching.
+        """
+        self._refresh()
+        entries, postings, vocabulary, haystacks = self._index
+
+        tokens = tokenize(query)
+        scores = None
+        for token in tokens:
+            token_scores = self._match_token(postings, vocabulary, token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {i: scores[i] + s for i, s in token_scores.items() if i in scores}
+            if not scores:
+                break
+
+        if not scores:
+            # e.g. a query starting mid-word ("lculus") or with punctuation only
+            needle = query.lower()
+            scores = {i: 0 for i, texts in enumerate(haystacks)
+                      if any(needle in text for text in texts)}
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        total = len(ranked)
+        end = None if limit is None else offset + limit
+        return total, [entries[i] for i in ranked[offset:end]]
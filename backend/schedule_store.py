@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+from bisect import bisect_right
+
+
+# --- Schedule Store ---
+# schedule.json is parsed once and indexed as room -> day -> lectures sorted by
+# start time (in minutes since midnight). The file is re-read only when its
+# modification time changes. A reload swaps in the new entries and index with
+# one assignment, so readers on other threads never see them half-updated.
+
+# Schedule "day" names by datetime.weekday()
+DAY_NAMES = {
+    0: "Monday", 1: "Tuesday", 2: "Wednesday", 3: "Thursday",
+    4: "Friday", 5: "Saturday", 6: "Sunday"
+}
+
+
+def parse_minutes(hhmm):
+    hour, minute = map(int, hhmm.split(":"))
+    return hour * 60 + minute
+
+
+def find_schedule_file():
+    # Try to find schedule.json in here or parent dir
+    here = os.path.dirname(__file__)
+    file_name = os.path.join(here, "schedule.json")
+    if not os.path.exists(file_name):
+        file_name = os.path.join(here, "..", "schedule.json")
+    return file_name
+
+
+class ScheduleStore:
+    def __init__(self, path=None):
+        self.path = path or find_schedule_file()
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.version = 0          # bumped on every (re)load
+        # (entries, room -> day -> {"starts", "max_ends", "lectures"},
+        #  queried room -> json rooms containing it, for names matching any)
+        self._state = ([], {}, {})
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._load(mtime)
+
+    def _load(self, mtime):
+        entries = []
+        if mtime is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data.get("schedule", []) if isinstance(data, dict) else data
+
+        # Lectures per (room, day) as (start, end, file order, entry)
+        grouped = {}
+        for order, entry in enumerate(entries):
+            try:
+                start = parse_minutes(entry.get("start", "00:00"))
+                end = parse_minutes(entry.get("end", "00:00"))
+            except ValueError:
+                continue
+            room = str(entry.get("room", ""))
+            day = entry.get("day", "")
+            grouped.setdefault(room, {}).setdefault(day, []).append((start, end, order, entry))
+
+        index = {}
+        for room, days in grouped.items():
+            for day, lectures in days.items():
+                lectures.sort(key=lambda lecture: (lecture[0], lecture[2]))
+                # Running max of end times lets a lookup stop scanning back early
+                max_ends = []
+                running = -1
+                for lecture in lectures:
+                    running = max(running, lecture[1])
+                    max_ends.append(running)
+                index.setdefault(room, {})[day] = {
+                    "starts": [lecture[0] for lecture in lectures],
+                    "max_ends": max_ends,
+                    "lectures": lectures,
+                }
+
+        self._state = (entries, index, {})
+        self._mtime = mtime
+        self.version += 1
+
+    @property
+    def available(self):
+        self._refresh()
+        return self._mtime is not None
+
+    def entries(self):
+        self._refresh()
+        return self._state[0]
+
+    def _slots(self, target_room, day):
+        # Same rule as before: a schedule room matches if it contains the name
+        self._refresh()
+        _, index, room_matches = self._state
+        rooms = room_matches.get(target_room)
+        if rooms is None:
+            rooms = [room for room in index if target_room in room]
+            # Names come straight from request URLs: only those matching a
+            # schedule room (substrings of one) are cached, which bounds the cache
+            if rooms:
+                room_matches[target_room] = rooms
+        return [index[room][day] for room in rooms if day in index[room]]
+
+    def occupancy(self, target_room, day, minutes):
+        """Return the schedule entry occupying `target_room` at `minutes` on `day`.
+
+        A lecture counts from its start through its end minute inclusive. When
+        several overlap, the one listed first in schedule.json wins.
+        """
+        best = None
+        for slot in self._slots(target_room, day):
+            i = bisect_right(slot["starts"], minutes) - 1
+            while i >= 0 and slot["max_ends"][i] >= minutes:
+                start, end, order, entry = slot["lectures"][i]
+                if end >= minutes and (best is None or order < best[0]):
+                    best = (order, entry)
+                i -= 1
+        return best[1] if best else None
+
+
+class AvailabilityIndex:
+    """Which map rooms are busy at any time, for many rooms at once.
+
+    Per day the lecture start/end minutes split the day into segments, each
+    with the set of rooms busy throughout it, so a lookup is one bisect
+    instead of a schedule check per room. Rooms match schedule entries by the
+    same rule as ScheduleStore.occupancy.
+    """
+
+    def __init__(self, entries, room_names):
+        rooms_for = {}   # schedule room -> map rooms it counts for
+        days = {}        # day -> [(start, end, map rooms)]
+        for entry in entries:
+            try:
+                start = parse_minutes(entry.get("start", "00:00"))
+                end = parse_minutes(entry.get("end", "00:00"))
+            except ValueError:
+                continue
+            room = str(entry.get("room", ""))
+            if room not in rooms_for:
+                rooms_for[room] = [name for name in room_names if name in room]
+            if rooms_for[room]:
+                days.setdefault(entry.get("day", ""), []).append((start, end, rooms_for[room]))
+        # Map rooms with any lecture; only these are known to be bookable rooms
+        self.rooms = frozenset(name for names in rooms_for.values() for name in names)
+
+        self._days = {}  # day -> (segment start minutes, busy rooms per segment)
+        for day, lectures in days.items():
+            # A lecture counts through its end minute, so it stops at end + 1
+            bounds = sorted({start for start, _, _ in lectures} | {end + 1 for _, end, _ in lectures})
+            busy = [frozenset(name for start, end, names in lectures if start <= bound <= end
+                              for name in names)
+                    for bound in bounds]
+            self._days[day] = (bounds, busy)
+
+    def busy(self, day, minutes):
+        """The set of map rooms occupied at `minutes` on `day`."""
+        segments = self._days.get(day)
+        if segments is None:
+            return frozenset()
+        bounds, busy = segments
+        i = bisect_right(bounds, minutes) - 1
+        return busy[i] if i >= 0 else frozenset()
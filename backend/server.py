@@ -1,50 +1,215 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import college_map_core as map_logic
+from route_cache import RouteCache
+from encoded_response import EncodedResponse
+from metrics import MetricsRegistry, SlowRequestProfiler, span
+from shared_state import SharedState
+import hmac
+import json
+import math
 import os
+import time
+from datetime import datetime
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Helper to ensure data is loaded
+# Helper to ensure data is loaded (a no-op if the import already loaded it)
 map_logic.load_map_data()
 
+# Admin changes go through files shared by every worker process (see
+# shared_state.py); closures survive restarts, profiling settings don't
+STATE_DIR = os.path.dirname(os.path.abspath(__file__))
+map_logic.share_closures(os.environ.get("CLOSURES_FILE", os.path.join(STATE_DIR, "closures.json")))
+
+# Destination -> destination routes become a table walk. A missing or stale
+# table is only built at startup if it is small (ROUTE_TABLE_MAX_MB, 0 never);
+# bigger campuses build it offline with python backend/route_table.py
+map_logic.use_route_table(max_bytes=float(os.environ.get("ROUTE_TABLE_MAX_MB", 64)) * 2**20)
+map_logic.warm_landmarks()
+
+# Encoded /api/path responses for popular routes (size 0 disables the cache)
+route_cache = RouteCache(
+    maxsize=int(os.environ.get("ROUTE_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("ROUTE_CACHE_TTL", 3600)),
+)
+MAX_ALTERNATIVES = 5  # routes per /api/path request, the best one included
+MAX_SEARCH_LIMIT = 500  # results per /api/schedule/search page
+MAX_BATCH_SOURCES = 50  # shortest-path trees per /api/paths/batch request
+MAX_BATCH_TARGETS = 500  # columns of its time and distance matrices
+
+# --- Instrumentation ---
+# Per-request stage timings and search counters, scraped from /metrics.
+# PROFILE_SLOW_MS turns on the slow-request profiler (see metrics.py).
+
+metrics = MetricsRegistry()
+metrics.describe("college_map_http_requests_total", "counter", "HTTP requests by endpoint, method and status.")
+metrics.describe("college_map_http_request_duration_seconds", "histogram", "Request latency by endpoint.")
+metrics.describe("college_map_stage_duration_seconds", "histogram",
+                 "Time spent per request stage (cache, search, directions, encode).")
+metrics.describe("college_map_searches_total", "counter",
+                 "Routes answered, by engine and by source (cache, route_table or search).")
+metrics.describe("college_map_search_expanded_nodes_total", "counter", "Nodes expanded by route searches.")
+metrics.describe("college_map_search_relaxed_edges_total", "counter", "Edges relaxed by route searches.")
+metrics.describe("college_map_search_expanded_nodes", "histogram", "Nodes expanded per route search.",
+                 buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000))
+metrics.describe("college_map_route_cache", "gauge", "Route response cache counters (see /api/stats/cache).")
+metrics.describe("college_map_map_version", "gauge", "Version of the live map, bumped on reloads and closures.")
+metrics.describe("college_map_slow_profiles_total", "counter", "Slow requests dumped by the profiler.")
+metrics.describe("college_map_alternative_searches_total", "counter",
+                 "Penalized searches run for alternative routes.")
+
+profiler = SlowRequestProfiler(
+    threshold_ms=float(os.environ["PROFILE_SLOW_MS"]) if os.environ.get("PROFILE_SLOW_MS") else None,
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 1.0)),
+    directory=os.environ.get("PROFILE_DIR"),
+    max_files=int(os.environ.get("PROFILE_MAX_FILES", 200)),
+)
+profiling_settings = SharedState(
+    os.environ.get("PROFILE_SETTINGS_FILE", os.path.join(STATE_DIR, "profiling.json")))
+# A restart goes back to the environment settings
+profiling_settings.update(lambda state: dict(state, slow_ms=profiler.threshold_ms,
+                                             sample_rate=profiler.sample_rate))
+
+def apply_profiling(state):
+    profiler.threshold_ms = state.get("slow_ms")
+    profiler.sample_rate = state.get("sample_rate", 1.0)
+
+@app.before_request
+def sync_shared_state():
+    # Admin changes made through the other worker processes (one stat per file)
+    changed = map_logic.sync_closures()
+    if changed:
+        invalidate_closures(*changed)
+    state = profiling_settings.changed()
+    if state is not None:
+        apply_profiling(state)
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.spans = {}
+    g.profile = profiler.start()
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.inc("college_map_http_requests_total", endpoint=endpoint, method=request.method,
+                status=response.status_code)
+    metrics.observe("college_map_http_request_duration_seconds", elapsed, endpoint=endpoint)
+    for stage, seconds in g.spans.items():
+        metrics.observe("college_map_stage_duration_seconds", seconds, endpoint=endpoint, stage=stage)
+    if profiler.finish(g.profile, elapsed, f"{request.method} {request.path}"):
+        metrics.inc("college_map_slow_profiles_total")
+    return response
+
+def record_search(engine, stats):
+    # "auto" is recorded as the engine it picked
+    engine = stats.get("engine", engine)
+    source = "route_table" if stats.get("route_table") else "search"
+    metrics.inc("college_map_searches_total", engine=engine, source=source)
+    if source == "search" and stats.get("expanded") is not None:
+        metrics.inc("college_map_search_expanded_nodes_total", stats["expanded"], engine=engine)
+        metrics.observe("college_map_search_expanded_nodes", stats["expanded"], engine=engine)
+    if source == "search" and stats.get("relaxed") is not None:
+        metrics.inc("college_map_search_relaxed_edges_total", stats["relaxed"], engine=engine)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    for key, value in route_cache.stats().items():
+        metrics.set("college_map_route_cache", value, stat=key)
+    metrics.set("college_map_map_version", map_logic.snapshot.version)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 map_logic.time()
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({"status": "ok"})
 
-@app.route('/api/nodes', methods=['GET'])
-def get_nodes():
+def build_node_list(graph):
     # Filter to return only meaningful destinations for start/end points
     # Include: rooms, departments, stairs, elevators
     # Exclude: corridors, waypoints (b_point, c_point, C_GF_XX, etc.)
     
     nodes = []
-    for name, data in map_logic.node_coordinates.items():
-        node_type = map_logic.node_types.get(name, "corridor")
-        floor = map_logic.node_floors.get(name, 0)
-        
-        # Skip corridor nodes
-        if node_type == "corridor":
-            continue
-            
-        # Skip waypoint-style names (b_point, c_point, C_GF_05, etc.)
-        name_lower = name.lower()
-        if any(pattern in name_lower for pattern in ['_point', 'c_gf_', 'c_ff_', 'c_sf_', '_corridor']):
+    for i, name in enumerate(graph.names):
+        # Skip corridor and waypoint-style nodes (b_point, c_point, C_GF_05, etc.)
+        if not map_logic.is_destination(name, graph):
             continue
-        
+
         nodes.append({
             "name": name,
-            "x": data[0],
-            "y": data[1],
-            "type": node_type,
-            "floor": floor
+            "x": graph.x[i],
+            "y": graph.y[i],
+            "type": graph.node_type(i),
+            "floor": graph.floor[i]
         })
     
     # Sort by name for easier dropdown navigation
     nodes.sort(key=lambda x: x["name"])
-    return jsonify(nodes)
+    return nodes
+
+NODE_FIELDS = ["name", "x", "y", "type", "floor"]
+
+# Pre-encoded /api/nodes bodies per (floor or None, format), rebuilt on map
+# reload. Held as one (map hash, variants) tuple so it is swapped atomically.
+node_responses = (None, {})
+
+def node_response(floor, fmt):
+    global node_responses
+    snap = map_logic.snapshot
+    map_hash, variants = node_responses
+    if map_hash != snap.map_hash:
+        nodes = build_node_list(snap.base_graph)
+        last_modified = os.path.getmtime(snap.map_path)
+        variants = {}
+        for key in [None] + sorted({node["floor"] for node in nodes}):
+            subset = [node for node in nodes if key is None or node["floor"] == key]
+            variants[(key, "full")] = EncodedResponse(subset, last_modified)
+            variants[(key, "compact")] = EncodedResponse({
+                "fields": NODE_FIELDS,
+                "nodes": [[node[field] for field in NODE_FIELDS] for node in subset],
+            }, last_modified)
+        node_responses = (snap.map_hash, variants)
+    return variants.get((floor, fmt))
+
+def serve_encoded(encoded):
+    headers = {
+        "ETag": encoded.etag,
+        "Last-Modified": encoded.last_modified,
+        "Cache-Control": "no-cache",  # always revalidate, usually a 304
+        "Vary": "Accept-Encoding",
+    }
+    if encoded.not_modified(request.headers):
+        return Response(status=304, headers=headers)
+    body, encoding = encoded.body_for(request.headers.get("Accept-Encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, mimetype="application/json", headers=headers)
+
+@app.route('/api/nodes', methods=['GET'])
+def get_nodes():
+    # Optional ?floor=N subset and ?format=compact ({"fields": [...], "nodes": [[...]]})
+    floor = request.args.get('floor', type=int)
+    fmt = request.args.get('format', 'full')
+    if fmt not in ("full", "compact"):
+        return jsonify({"error": "Unknown format, expected full or compact"}), 400
+
+    encoded = node_response(floor, fmt)
+    if encoded is None:
+        return jsonify([] if fmt == "full" else {"fields": NODE_FIELDS, "nodes": []})
+    return serve_encoded(encoded)
+
+def parse_departure_time(value):
+    # Accepts a full ISO timestamp ("2025-12-21T13:30") or "HH:MM" for today
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+    hour, minute = map(int, str(value).split(":"))
+    return datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
 
 @app.route('/api/path', methods=['POST'])
 def calculate_path():
@@ -52,92 +217,388 @@ def calculate_path():
     start = data.get('start')
     end = data.get('end')
     mode = data.get('mode', 'normal')
+    engine = data.get('engine', 'astar')
 
     if not start or not end:
         return jsonify({"error": "Missing start or end node"}), 400
+    # The search, directions and path details all use this one snapshot, so a
+    # map reload mid-request can't mix two maps
+    snap = map_logic.snapshot
+    # Either end may be a {"x", "y", "floor"} position, snapped to the nearest node
+    start = map_logic.resolve_location(start, snap)
+    end = map_logic.resolve_location(end, snap)
+    if not start or not end:
+        return jsonify({"error": "Could not resolve start or end position"}), 400
+    if engine not in map_logic.ENGINES:
+        return jsonify({"error": f"Unknown engine, expected one of {', '.join(map_logic.ENGINES)}"}), 400
+    # The mode is part of the cache key. Unknown modes route like "normal"
+    # (see CompiledGraph.weights), so they share its entries
+    if not isinstance(mode, str):
+        return jsonify({"error": "mode must be a string"}), 400
+    if mode not in map_logic.MODES:
+        mode = "normal"
+    # Total number of routes wanted, the best one included
+    try:
+        alternatives = int(data.get('alternatives', 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "alternatives must be an integer"}), 400
+    alternatives = min(max(alternatives, 1), MAX_ALTERNATIVES)
+    # Alternatives are costed with static edge times, which a congested route can't be compared to
+    if alternatives > 1 and engine == "td":
+        return jsonify({"error": "alternatives are not available with the td engine"}), 400
+
+    # Optional departure time for planning a route ahead; defaults to now
+    departure = None
+    if data.get('departure_time'):
+        try:
+            departure = parse_departure_time(data['departure_time'])
+        except ValueError:
+            return jsonify({"error": "Invalid departure_time"}), 400
 
-    path, total_time, total_distance = map_logic.a_star(start, end, mode)
+    # The response only depends on the endpoints, mode, break regime, engine
+    # and number of routes
+    is_break = map_logic.is_break_time(map_logic.time(departure)["hour"])
+    cache_key = (start, end, mode, is_break, engine)
+    if alternatives > 1:
+        cache_key += (alternatives,)
+    if engine == "td":
+        # Time-dependent routes also depend on the congestion time bin and on
+        # the schedule the congestion was derived from (it is hot-reloaded)
+        cache_key += (map_logic.congestion_bin(departure), map_logic.schedule.version)
+    with span(g.spans, "cache"):
+        route_cache.bind(snap.map_hash)
+        body = route_cache.get(cache_key)
+    if body is not None:
+        metrics.inc("college_map_searches_total", engine=engine, source="cache")
+        return Response(body, mimetype="application/json")
+
+    stats = {}
+    with span(g.spans, "search"):
+        path, total_time, total_distance = map_logic.a_star(start, end, mode, at=departure,
+                                                            stats=stats, engine=engine, snap=snap)
+    record_search(engine, stats)
 
     if not path:
         return jsonify({"error": "No path found"}), 404
 
+    routes = []
+    if alternatives > 1:
+        alternative_stats = {}
+        with span(g.spans, "alternatives"):
+            routes = map_logic.alternative_routes(start, end, alternatives, mode, at=departure,
+                                                  first=path, stats=alternative_stats,
+                                                  snap=snap)[1:]
+        metrics.inc("college_map_alternative_searches_total", alternative_stats.get("searches", 0))
+
+    with span(g.spans, "directions"):
+        directions = map_logic.generate_directions(path, snap)
+        alternative_directions = [map_logic.generate_directions(route, snap) for route, _, _ in routes]
+
     # Build response with full path details including coordinates for drawing
-    path_details = []
-    for node in path:
-        coords = map_logic.node_coordinates.get(node)
-        floor = map_logic.node_floors.get(node, 0)
-        path_details.append({
-            "name": node,
-            "x": coords[0],
-            "y": coords[1],
-            "floor": floor
+    with span(g.spans, "encode"):
+        graph = snap.base_graph
+
+        def details(route):
+            path_details = []
+            for node in route:
+                i = graph.index[node]
+                path_details.append({
+                    "name": node,
+                    "x": graph.x[i],
+                    "y": graph.y[i],
+                    "floor": graph.floor[i]
+                })
+            return path_details
+
+        response = {
+            "path": path,
+            "path_details": details(path),
+            "total_time_seconds": total_time,
+            "total_distance_meters": total_distance,
+            "directions": directions
+        }
+        if alternatives > 1:
+            # Floor changes name the stairs or elevator a route takes
+            response["alternatives"] = [{
+                "path": route,
+                "path_details": details(route),
+                "total_time_seconds": route_time,
+                "total_distance_meters": route_distance,
+                "directions": route_directions,
+                "via": [node for node in route
+                        if graph.node_type(graph.index[node]) in ("stairs", "elevator")]
+            } for (route, route_time, route_distance), route_directions in zip(routes, alternative_directions)]
+        body = json.dumps(response).encode("utf-8")
+    # Closures drop the entry if they touch any of its routes
+    nodes = set(path)
+    for route, _, _ in routes:
+        nodes.update(route)
+    route_cache.put(cache_key, body, nodes, snap.version)
+    return Response(body, mimetype="application/json")
+
+@app.route('/api/paths/batch', methods=['POST'])
+def calculate_paths_batch():
+    data = request.json or {}
+    sources = data.get('sources') or ([data['source']] if data.get('source') else None)
+    targets = data.get('targets')
+    mode = data.get('mode', 'normal')
+
+    if not sources:
+        return jsonify({"error": "Missing source or sources"}), 400
+    # A string would be split into characters, and each source costs a full search
+    if not isinstance(sources, list) or (targets is not None and not isinstance(targets, list)):
+        return jsonify({"error": "sources and targets must be lists of node names"}), 400
+    if not all(isinstance(name, str) for name in sources + (targets or [])):
+        return jsonify({"error": "sources and targets must be lists of node names"}), 400
+    if len(sources) > MAX_BATCH_SOURCES or len(targets or ()) > MAX_BATCH_TARGETS:
+        return jsonify({"error": f"At most {MAX_BATCH_SOURCES} sources and "
+                                 f"{MAX_BATCH_TARGETS} targets per request"}), 400
+
+    departure = None
+    if data.get('departure_time'):
+        try:
+            departure = parse_departure_time(data['departure_time'])
+        except ValueError:
+            return jsonify({"error": "Invalid departure_time"}), 400
+
+    try:
+        with span(g.spans, "search"):
+            result = map_logic.route_batch(sources, targets, mode, at=departure,
+                                           include_paths=bool(data.get('include_paths')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Unreachable targets are reported as null rather than Infinity
+    for key in ("times", "distances"):
+        result[key] = [[v if v != float('inf') else None for v in row] for row in result[key]]
+    return jsonify(result)
+
+@app.route('/api/itinerary', methods=['POST'])
+def calculate_itinerary():
+    # {"group": "A", "start": "Gate1", "end": "Gate1", "stops": ["Library-door1"],
+    #  "mode": "normal", "departure_time": "08:30", "reorder": true}
+    data = request.json or {}
+    stops = data.get('stops') or []
+    if not isinstance(stops, list):
+        return jsonify({"error": "stops must be a list"}), 400
+
+    departure = None
+    if data.get('departure_time'):
+        try:
+            departure = parse_departure_time(data['departure_time'])
+        except ValueError:
+            return jsonify({"error": "Invalid departure_time"}), 400
+
+    try:
+        with span(g.spans, "search"):
+            result = map_logic.plan_itinerary(stops, data.get('group'), data.get('start'), data.get('end'),
+                                              data.get('mode', 'normal'), at=departure,
+                                              reorder=bool(data.get('reorder')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+def node_summary(name, distance_px):
+    graph = map_logic.snapshot.base_graph
+    i = graph.index[name]
+    return {
+        "name": name,
+        "x": graph.x[i],
+        "y": graph.y[i],
+        "floor": graph.floor[i],
+        "type": graph.node_type(i),
+        "distance_meters": distance_px * map_logic.METERS_PER_PIXEL,
+    }
+
+@app.route('/api/snap', methods=['GET'])
+def snap_position():
+    # ?x=..&y=..&floor=N: the k nearest nodes (optionally &types=room,department),
+    # or with &edge=true the closest point on the nearest corridor segment
+    x = request.args.get('x', type=float)
+    y = request.args.get('y', type=float)
+    floor = request.args.get('floor', 0, type=int)
+    if x is None or y is None:
+        return jsonify({"error": "Missing or invalid x or y"}), 400
+
+    if request.args.get('edge', '').lower() in ("1", "true", "yes"):
+        found = map_logic.snap_to_edge(x, y, floor)
+        if found is None:
+            return jsonify({"error": "No corridors on this floor"}), 404
+        node_a, node_b, t, px, py, distance_px = found
+        # The end of the segment the snapped point is closer to
+        node = node_a if t < 0.5 else node_b
+        coords = map_logic.node_coordinates[node]
+        return jsonify({
+            "edge": {"from": node_a, "to": node_b, "t": t, "x": px, "y": py,
+                     "distance_meters": distance_px * map_logic.METERS_PER_PIXEL},
+            "node": node_summary(node, math.hypot(coords[0] - x, coords[1] - y)),
         })
 
-    directions = map_logic.generate_directions(path)
+    k = min(max(request.args.get('k', 1, type=int), 1), 50)
+    types = [t for t in request.args.get('types', '').split(',') if t] or None
+    nodes = map_logic.snap_to_nodes(x, y, floor, k, types)
+    if not nodes:
+        return jsonify({"error": "No matching nodes on this floor"}), 404
+    return jsonify({"nodes": [node_summary(name, d) for name, d in nodes]})
 
-    return jsonify({
-        "path": path,
-        "path_details": path_details,
-        "total_time_seconds": total_time,
-        "total_distance_meters": total_distance,
-        "directions": directions
-    })
+@app.route('/api/nearest', methods=['GET'])
+def find_nearest():
+    # ?start=VIP&types=elevator,stairs | &name=toilet | &free=true, plus k, mode, departure_time
+    start = request.args.get('start')
+    if not start:
+        return jsonify({"error": "Missing start node"}), 400
+    types = [t for t in request.args.get('types', '').split(',') if t] or None
+    name = request.args.get('name') or None
+    free = request.args.get('free', '').lower() in ("1", "true", "yes")
+    k = min(max(request.args.get('k', 5, type=int), 1), 50)
+    mode = request.args.get('mode', 'normal')
 
-@app.route('/api/schedule/<room_name>', methods=['GET'])
-def check_schedule(room_name):
-    # This logic is a bit print-heavy in the original script. 
-    # We might need to parse the JSON directly here or adjust the helper.
-    # The original check_room_status prints to stdout. We should probably just read the json here or refactor.
-    # Let's read the json directly to avoid stdout capture mess.
-    
-    # Try to find schedule.json in here or parent dir
-    here = os.path.dirname(__file__)
-    schedule_file = os.path.join(here, "schedule.json")
-    if not os.path.exists(schedule_file):
-        schedule_file = os.path.join(here, "..", "schedule.json")
+    departure = None
+    if request.args.get('departure_time'):
+        try:
+            departure = parse_departure_time(request.args['departure_time'])
+        except ValueError:
+            return jsonify({"error": "Invalid departure_time"}), 400
 
-    if not os.path.exists(schedule_file):
-        return jsonify({"status": "unknown", "message": "Schedule file missing"})
+    try:
+        with span(g.spans, "search"):
+            results = map_logic.nearest(start, types, name, free, k, mode, at=departure)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify({"start": start, "results": results})
 
-    import json
-    
-    current_hour, current_minute, today_str = map_logic.show_current_time()
-    current_time_minutes = (current_hour * 60) + current_minute
+# --- Admin: runtime closures ---
+# These routes need an X-Admin-Token header matching ADMIN_TOKEN; with no
+# ADMIN_TOKEN set they are disabled.
 
-    with open(schedule_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def admin_denied():
+    token = os.environ.get("ADMIN_TOKEN")
+    given = request.headers.get("X-Admin-Token", "")
+    if not token or not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+        return jsonify({"error": "Forbidden"}), 403
+    return None
+
+def availability_state():
+    # The version counts closure changes made through any worker process
+    snap = map_logic.snapshot
+    return {
+        "version": map_logic.closures_version,
+        "closed_nodes": sorted(snap.closed_nodes),
+        "closed_edges": sorted(sorted(edge) for edge in snap.closed_edges),
+    }
+
+def invalidate_routes(nodes, available, all_of=False):
+    # A closure can only break routes through it; a reopening may shorten any route.
+    # Searches still running on the previous version won't be cached afterwards.
+    version = map_logic.snapshot.version
+    if available:
+        route_cache.clear(version)
+    else:
+        route_cache.invalidate_nodes(nodes, all_of, version)
+
+def invalidate_closures(previous, snap):
+    # Closures made through another worker process, picked up by sync_closures()
+    if previous.closed_nodes - snap.closed_nodes or previous.closed_edges - snap.closed_edges:
+        route_cache.clear(snap.version)
+        return
+    route_cache.invalidate_nodes(snap.closed_nodes - previous.closed_nodes, version=snap.version)
+    for edge in snap.closed_edges - previous.closed_edges:
+        route_cache.invalidate_nodes(edge, all_of=True, version=snap.version)
+
+@app.route('/api/admin/availability', methods=['GET'])
+def get_availability():
+    denied = admin_denied()
+    if denied:
+        return denied
+    return jsonify(availability_state())
+
+@app.route('/api/admin/nodes/<node_name>', methods=['POST'])
+def set_node_availability(node_name):
+    denied = admin_denied()
+    if denied:
+        return denied
+    available = (request.json or {}).get('available', True)
+    if not isinstance(available, bool):
+        return jsonify({"error": "available must be true or false"}), 400
+    try:
+        map_logic.set_node_available(node_name, available)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    invalidate_routes([node_name], available)
+    return jsonify(availability_state())
+
+@app.route('/api/admin/edges', methods=['POST'])
+def set_edge_availability():
+    denied = admin_denied()
+    if denied:
+        return denied
+    data = request.json or {}
+    node_a, node_b = data.get('from'), data.get('to')
+    if not node_a or not node_b:
+        return jsonify({"error": "Missing from or to node"}), 400
+    available = data.get('available', True)
+    if not isinstance(available, bool):
+        return jsonify({"error": "available must be true or false"}), 400
+    try:
+        map_logic.set_edge_available(node_a, node_b, available)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    # Routes using the edge contain both of its ends
+    invalidate_routes([node_a, node_b], available, all_of=True)
+    return jsonify(availability_state())
+
+def profiling_state():
+    return {
+        "enabled": profiler.enabled,
+        "slow_ms": profiler.threshold_ms,
+        "sample_rate": profiler.sample_rate,
+        "directory": profiler.directory,
+        "dumped": profiler.dumped,
+    }
+
+@app.route('/api/admin/profiling', methods=['GET', 'POST'])
+def set_profiling():
+    # POST {"slow_ms": 200, "sample_rate": 0.1} turns profiling on, {"slow_ms": null} off.
+    # Needs the admin token: profiles are written to disk on the server
+    denied = admin_denied()
+    if denied:
+        return denied
+    if request.method == 'POST':
+        data = request.json or {}
+        changes = {}
+        try:
+            if 'slow_ms' in data:
+                changes['slow_ms'] = None if data['slow_ms'] is None else float(data['slow_ms'])
+            if 'sample_rate' in data:
+                changes['sample_rate'] = min(max(float(data['sample_rate']), 0.0), 1.0)
+        except (TypeError, ValueError):
+            return jsonify({"error": "slow_ms and sample_rate must be numbers"}), 400
+        # Saved for the other worker processes too
+        apply_profiling(profiling_settings.update(lambda state: dict(state, **changes)))
+    return jsonify(profiling_state())
+
+@app.route('/api/stats/cache', methods=['GET'])
+def cache_stats():
+    return jsonify({"routes": route_cache.stats()})
+
+@app.route('/api/schedule/<room_name>', methods=['GET'])
+def check_schedule(room_name):
+    if not map_logic.schedule.available:
+        return jsonify({"status": "unknown", "message": "Schedule file missing"})
 
-    schedule_data = data.get("schedule", []) if isinstance(data, dict) else data
-    
     occupancy = {"status": "Available", "details": None}
-    
-    for course in schedule_data:
-        room_in_json = str(course.get("room", ""))
-        day_in_json = course.get("day", "")
-        
-        if room_name in room_in_json and day_in_json == today_str:
-            start_str = course.get("start", "00:00")
-            end_str = course.get("end", "00:00")
-            
-            try:
-                start_h, start_m = map(int, start_str.split(":"))
-                end_h, end_m = map(int, end_str.split(":"))
-                lecture_start = (start_h * 60) + start_m
-                lecture_end = (end_h * 60) + end_m
-                
-                if lecture_start <= current_time_minutes <= lecture_end:
-                    occupancy = {
-                        "status": "Occupied",
-                        "details": {
-                            "course": course.get("course"),
-                            "instructor": course.get("instructor"),
-                            "time": f"{start_str} - {end_str}",
-                            "type": course.get("type", "Lecture")
-                        }
-                    }
-                    break
-            except ValueError:
-                continue
+
+    course = map_logic.room_occupancy(room_name)
+    if course:
+        occupancy = {
+            "status": "Occupied",
+            "details": {
+                "course": course.get("course"),
+                "instructor": course.get("instructor"),
+                "time": f"{course.get('start', '00:00')} - {course.get('end', '00:00')}",
+                "type": course.get("type", "Lecture")
+            }
+        }
                 
     return jsonify(occupancy)
 @app.route('/api/schedule/search', methods=['GET'])
@@ -145,8 +606,15 @@ def search_schedule():
     query = request.args.get('q', '')
     if not query:
         return jsonify([])
-    results = map_logic.search_schedule(query)
-    return jsonify(results)
+    # No limit returns every match (the frontend relies on it); a given one is clamped
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = min(max(limit, 0), MAX_SEARCH_LIMIT)
+    offset = request.args.get('offset', 0, type=int)
+    total, results = map_logic.schedule_index.search(query, limit, max(offset, 0))
+    response = jsonify(results)
+    response.headers['X-Total-Count'] = str(total)
+    return response
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
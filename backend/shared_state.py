@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: waitress serves from a single process anyway
+    fcntl = None
+
+
+# --- State Shared Between Worker Processes ---
+# Under gunicorn every worker process has its own copy of the map, so a
+# change made through one worker (closing an elevator...) has to reach the
+# others. Such state lives in a small JSON file: a change is a locked
+# read-modify-write replaced atomically, and each worker re-reads the file
+# when the file is replaced, the same way ScheduleStore follows
+# schedule.json. Every write bumps a "version" counter shared by all workers.
+
+def _signature(path):
+    # Every write replaces the file, so a new inode also catches two writes
+    # within one mtime tick
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class SharedState:
+    def __init__(self, path):
+        self.path = path
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def changed(self):
+        """The state if the file changed since the last call (or update), else None."""
+        try:
+            signature = _signature(self.path)
+        except OSError:
+            return None
+        with self._lock:
+            if signature == self._signature:
+                return None
+            self._signature = signature
+        return self._read()
+
+    def update(self, change):
+        """Apply `change(state) -> state` under an inter-process lock and save
+        the result with its version bumped. Returns the saved state."""
+        with self._lock, open(self.path + ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = change(self._read())
+                state["version"] = state.get("version", 0) + 1
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+                # This process already has the new state
+                self._signature = _signature(self.path)
+                return state
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
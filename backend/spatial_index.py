@@ -0,0 +1,129 @@
+import math
+
+
+# --- Spatial Index ---
+# Snaps a pixel position on a floor to the closest graph nodes or corridor
+# segment. Each floor gets a uniform grid sized to its node density; nodes
+# live in the cell containing them and same-floor edges in every cell their
+# bounding box touches. A query scans rings of cells outwards from the point
+# and stops once the next ring can't hold anything closer than what it has.
+
+class SpatialIndex:
+    def __init__(self, graph):
+        self.graph = graph
+        self._floors = {}  # floor -> (cell size, {cell: [node ids]}, {cell: [(a, b)]}, occupied cell bounds)
+
+        by_floor = {}
+        for i in range(graph.node_count):
+            by_floor.setdefault(graph.floor[i], []).append(i)
+
+        for floor, nodes in by_floor.items():
+            xs = [graph.x[i] for i in nodes]
+            ys = [graph.y[i] for i in nodes]
+            width = max(xs) - min(xs)
+            height = max(ys) - min(ys)
+            # About two nodes per cell on an evenly filled floor
+            cell = max(math.sqrt(max(width * height, 1.0) / len(nodes) * 2), 1.0)
+
+            node_cells = {}
+            for i in nodes:
+                node_cells.setdefault(self._cell(cell, graph.x[i], graph.y[i]), []).append(i)
+
+            edge_cells = {}
+            for a in nodes:
+                for e in range(graph.offsets[a], graph.offsets[a + 1]):
+                    b = graph.targets[e]
+                    # Each corridor once, whichever direction(s) it is stored in
+                    if graph.floor[b] != floor or (a > b and graph.has_edge(b, a)):
+                        continue
+                    cx0, cy0 = self._cell(cell, min(graph.x[a], graph.x[b]), min(graph.y[a], graph.y[b]))
+                    cx1, cy1 = self._cell(cell, max(graph.x[a], graph.x[b]), max(graph.y[a], graph.y[b]))
+                    for cx in range(cx0, cx1 + 1):
+                        for cy in range(cy0, cy1 + 1):
+                            edge_cells.setdefault((cx, cy), []).append((a, b))
+
+            cells = list(node_cells) + list(edge_cells)
+            bounds = (min(cx for cx, _ in cells), min(cy for _, cy in cells),
+                      max(cx for cx, _ in cells), max(cy for _, cy in cells))
+            self._floors[floor] = (cell, node_cells, edge_cells, bounds)
+
+    @staticmethod
+    def _cell(size, x, y):
+        return int(math.floor(x / size)), int(math.floor(y / size))
+
+    @staticmethod
+    def _rings(cx, cy, bounds):
+        """Yield (r, cells of ring r inside `bounds`) outwards from (cx, cy),
+        from the first ring that reaches the bounds to the last one."""
+        x0, y0, x1, y1 = bounds
+        first = max(x0 - cx, cx - x1, y0 - cy, cy - y1, 0)
+        last = max(cx - x0, x1 - cx, cy - y0, y1 - cy)
+        for r in range(first, last + 1):
+            cells = []
+            left, right = max(cx - r, x0), min(cx + r, x1)
+            for y in {cy - r, cy + r}:
+                if y0 <= y <= y1:
+                    cells.extend((x, y) for x in range(left, right + 1))
+            for x in {cx - r, cx + r}:
+                if x0 <= x <= x1:
+                    cells.extend((x, y) for y in range(max(cy - r + 1, y0), min(cy + r - 1, y1) + 1))
+            yield r, cells
+
+    def nearest_nodes(self, floor, x, y, k=1, accept=None):
+        """The `k` nodes on `floor` closest to (x, y), as (node id, pixels).
+
+        `accept(node id)`, if given, filters the candidates.
+        """
+        entry = self._floors.get(floor)
+        if entry is None:
+            return []
+        size, node_cells, _, bounds = entry
+        graph = self.graph
+        cx, cy = self._cell(size, x, y)
+
+        found = []
+        for r, cells in self._rings(cx, cy, bounds):
+            for cell in cells:
+                for i in node_cells.get(cell, ()):
+                    if accept is None or accept(i):
+                        found.append((math.hypot(graph.x[i] - x, graph.y[i] - y), i))
+            # Anything in ring r + 1 is at least r cell widths away
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= r * size:
+                    break
+        found.sort()
+        return [(i, d) for d, i in found[:k]]
+
+    def nearest_edge(self, floor, x, y, accept=None):
+        """The closest same-floor corridor segment to (x, y).
+
+        Returns (a, b, t, px, py, pixels): the edge's node ids, the position
+        0..1 of the closest point (px, py) along a -> b, and its distance; or
+        None if the floor has no edges. `accept(a, b)` filters candidates.
+        """
+        entry = self._floors.get(floor)
+        if entry is None:
+            return None
+        size, _, edge_cells, bounds = entry
+        graph = self.graph
+        cx, cy = self._cell(size, x, y)
+
+        best = None
+        for r, cells in self._rings(cx, cy, bounds):
+            for cell in cells:
+                for a, b in edge_cells.get(cell, ()):
+                    if accept is not None and not accept(a, b):
+                        continue
+                    ax, ay = graph.x[a], graph.y[a]
+                    dx, dy = graph.x[b] - ax, graph.y[b] - ay
+                    length2 = dx*dx + dy*dy
+                    t = ((x - ax) * dx + (y - ay) * dy) / length2 if length2 else 0.0
+                    t = min(max(t, 0.0), 1.0)
+                    px, py = ax + t * dx, ay + t * dy
+                    d = math.hypot(px - x, py - y)
+                    if best is None or d < best[5]:
+                        best = (a, b, t, px, py, d)
+            if best is not None and best[5] <= r * size:
+                break
+        return best
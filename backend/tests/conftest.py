@@ -0,0 +1,44 @@
+import itertools
+import os
+import random
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAP_PATH = os.path.join(os.path.dirname(BACKEND), "college_map_data.json")
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, BACKEND)
+
+import college_map_core as map_logic  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def core(tmp_path_factory):
+    """The core module with the bundled map loaded and no route table."""
+    # Ignore any compiled map next to the backend: always compile the JSON
+    map_logic.compiled_map_path = str(tmp_path_factory.mktemp("map") / "college_map.bin")
+    assert map_logic.load_map_data(MAP_PATH, force=True)
+    map_logic.route_table = None
+    return map_logic
+
+
+@pytest.fixture
+def sample_pairs(core):
+    """sample_pairs(count, seed) -> that many random (start, goal) destination pairs."""
+    def sample(count, seed=0):
+        pairs = list(itertools.permutations(core.destination_nodes(), 2))
+        return random.Random(seed).sample(pairs, min(count, len(pairs)))
+    return sample
+
+
+@pytest.fixture
+def assert_valid_path(core):
+    """assert_valid_path(path, start, goal) on the live graph."""
+    def check(path, start, goal):
+        graph = core.snapshot.graph
+        assert path[0] == start and path[-1] == goal
+        for a, b in zip(path, path[1:]):
+            assert graph.has_edge(graph.index[a], graph.index[b])
+    return check
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+
+MORNING = datetime(2026, 10, 12, 10, 30)
+
+
+def test_alternatives_start_with_the_best_route(core, sample_pairs, assert_valid_path):
+    for start, goal in sample_pairs(30, seed=5):
+        path, total_time, _ = core.a_star(start, goal, at=MORNING)
+        routes = core.alternative_routes(start, goal, 3, at=MORNING, first=path)
+        assert routes[0][0] == path
+        assert routes[0][1] == pytest.approx(total_time)
+        for route, route_time, _ in routes:
+            assert_valid_path(route, start, goal)
+            assert route_time <= total_time * 1.6 + 1e-6
+        assert len({tuple(route) for route, _, _ in routes}) == len(routes)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from map_graph import MODES
+
+MORNING = datetime(2026, 10, 12, 10, 30)
+BREAK = datetime(2026, 10, 12, 13, 30)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("at", [MORNING, BREAK])
+def test_bidirectional_matches_astar(core, sample_pairs, assert_valid_path, mode, at):
+    for start, goal in sample_pairs(150):
+        path, total_time, _ = core.a_star(start, goal, mode, at=at)
+        bidir_path, bidir_time, _ = core.a_star(start, goal, mode, at=at, engine="bidir")
+        assert bidir_time == pytest.approx(total_time, abs=1e-6)
+        if path:
+            assert_valid_path(bidir_path, start, goal)
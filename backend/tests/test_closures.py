@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+from route_cache import RouteCache
+from shared_state import SharedState
+
+MORNING = datetime(2026, 10, 12, 10, 30)
+
+
+@pytest.fixture
+def shared(core, tmp_path, monkeypatch):
+    """Closures kept in a temporary file, reopened after the test."""
+    monkeypatch.setattr(core, "closures", None)
+    monkeypatch.setattr(core, "closures_version", 0)
+    path = str(tmp_path / "closures.json")
+    core.share_closures(path)
+    yield path
+    with core._update_lock:
+        core._apply_availability(frozenset(), frozenset())
+
+
+def middle_node(core, start, goal):
+    path, _, _ = core.a_star(start, goal, at=MORNING)
+    return path, path[len(path) // 2]
+
+
+def test_routes_avoid_closed_nodes(core, shared, sample_pairs, assert_valid_path):
+    for start, goal in sample_pairs(10, seed=2):
+        path, node = middle_node(core, start, goal)
+        if node in (start, goal):
+            continue
+        core.set_node_available(node, False)
+        detour, _, _ = core.a_star(start, goal, at=MORNING)
+        if detour:
+            assert node not in detour
+            assert_valid_path(detour, start, goal)
+        core.set_node_available(node, True)
+        assert core.a_star(start, goal, at=MORNING)[0] == path
+
+
+def test_closures_reach_other_processes(core, shared):
+    # Another worker process: its own SharedState on the same file
+    other = SharedState(shared)
+    assert core.sync_closures() is None
+
+    state = other.update(lambda state: dict(state, closed_nodes=["VIP"], closed_edges=[["203", "nowhere"]]))
+    previous, snap = core.sync_closures()
+    assert "VIP" not in previous.closed_nodes
+    assert snap.closed_nodes == {"VIP"}
+    assert not snap.closed_edges  # not an edge of this map
+    assert core.closures_version == state["version"]
+    assert core.sync_closures() is None
+
+    # Changes made here keep the ones made elsewhere
+    core.set_node_available("203", False)
+    assert set(other.changed()["closed_nodes"]) == {"203", "VIP"}
+    core.set_node_available("VIP", True)
+    assert other.changed()["closed_nodes"] == ["203"]
+
+
+def test_closures_invalidate_cached_routes():
+    cache = RouteCache(maxsize=10)
+    cache.put("a", b"a", nodes=["A", "B", "C"], version=1)
+    cache.put("b", b"b", nodes=["B", "D"], version=1)
+    cache.put("c", b"c", nodes=["E"], version=1)
+
+    # An edge only drops the routes through both of its ends
+    assert cache.invalidate_nodes(["B", "C"], all_of=True, version=2) == 1
+    assert cache.get("a") is None and cache.get("b") == b"b"
+    assert cache.invalidate_nodes(["B", "E"], version=3) == 2
+    assert cache.stats()["size"] == 0
+
+    # A search that started before the closure can't cache its stale route
+    cache.put("a", b"stale", nodes=["A", "B"], version=2)
+    assert cache.get("a") is None
+    cache.put("a", b"a", nodes=["A", "B"], version=3)
+    assert cache.get("a") == b"a"
@@ -0,0 +1,38 @@
+import json
+
+import compiled_map
+from map_graph import MODES, REGIMES, compile_graph
+
+
+def test_compiled_map_matches_json_compile(core, tmp_path):
+    with open(core.snapshot.map_path, "rb") as f:
+        data = json.loads(f.read().decode("utf-8"))
+    graph = compile_graph(data, core.edge_time_cost, core.METERS_PER_PIXEL)
+    path = str(tmp_path / "college_map.bin")
+    compiled_map.save_compiled_map(graph, core.snapshot.map_hash, core.cost_params(), path)
+
+    loaded = compiled_map.load_compiled_map(path, core.snapshot.map_hash, core.cost_params())
+    assert loaded is not None
+    assert loaded.names == graph.names
+    assert tuple(loaded.type_names) == tuple(graph.type_names)
+    for field in ("x", "y", "floor", "type_code", "nearby_place", "offsets", "targets",
+                  "edge_dist", "edge_bearing"):
+        assert list(getattr(loaded, field)) == list(getattr(graph, field)), field
+    for mode in MODES:
+        for is_break in REGIMES:
+            assert list(loaded.weights(mode, is_break)) == list(graph.weights(mode, is_break))
+
+
+def test_compiled_map_rejects_stale_or_corrupt_files(core, tmp_path):
+    path = str(tmp_path / "college_map.bin")
+    compiled_map.save_compiled_map(core.snapshot.base_graph, core.snapshot.map_hash,
+                                   core.cost_params(), path)
+    assert compiled_map.load_compiled_map(path, "0" * 64, core.cost_params()) is None
+    assert compiled_map.load_compiled_map(path, core.snapshot.map_hash, "other params") is None
+
+    with open(path, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    assert compiled_map.load_compiled_map(path, core.snapshot.map_hash, core.cost_params()) is None
@@ -0,0 +1,25 @@
+from array import array
+
+import pytest
+
+from congestion import BINS_PER_WEEK, CongestionProfile, time_dependent_search
+
+
+def test_congestion_only_slows_walking(core):
+    graph = core.snapshot.graph
+    weights = graph.weights("stairs", False)
+    # Every node in one zone that doubles walking times all week
+    profile = CongestionProfile(array('h', [0] * graph.node_count),
+                                [array('d', [1.0] * BINS_PER_WEEK)], ["everywhere"])
+    floors_crossed = 0
+    for start, goal in [("VIP", "318A"), ("203", "241"), ("318B", "VIP")]:
+        source, target = graph.index[start], graph.index[goal]
+        path, total_time, _, _ = time_dependent_search(
+            graph, source, target, weights, lambda node: 0.0, profile, 0)
+        expected = 0.0
+        for a, b in zip(path, path[1:]):
+            walking = graph.floor[a] == graph.floor[b]
+            floors_crossed += not walking
+            expected += weights[graph.edge_index(a, b)] * (2 if walking else 1)
+        assert total_time == pytest.approx(expected)
+    assert floors_crossed
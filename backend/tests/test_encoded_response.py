@@ -0,0 +1,42 @@
+import gzip
+import json
+from email.utils import formatdate
+
+from encoded_response import EncodedResponse
+
+LOADED_AT = 1_760_000_000
+
+
+def test_etag_revalidation():
+    response = EncodedResponse({"nodes": [1, 2, 3]}, LOADED_AT)
+    assert response.not_modified({"If-None-Match": response.etag})
+    assert response.not_modified({"If-None-Match": '"other", W/' + response.etag})
+    assert response.not_modified({"If-None-Match": "*"})
+    assert not response.not_modified({"If-None-Match": '"other"'})
+    assert not response.not_modified({})
+
+    # The ETag follows the content, not key order
+    assert EncodedResponse({"b": 1, "a": 2}, 0).etag == EncodedResponse({"a": 2, "b": 1}, 5).etag
+    assert EncodedResponse({"a": 1}, 0).etag != response.etag
+
+
+def test_last_modified_revalidation():
+    response = EncodedResponse({"nodes": []}, LOADED_AT + 0.7)
+    assert response.last_modified == formatdate(LOADED_AT, usegmt=True)
+    assert response.not_modified({"If-Modified-Since": response.last_modified})
+    assert response.not_modified({"If-Modified-Since": formatdate(LOADED_AT + 60, usegmt=True)})
+    assert not response.not_modified({"If-Modified-Since": formatdate(LOADED_AT - 1, usegmt=True)})
+    assert not response.not_modified({"If-Modified-Since": "yesterday"})
+
+    # A stale ETag wins over a fresh date
+    assert not response.not_modified({"If-None-Match": '"other"',
+                                      "If-Modified-Since": response.last_modified})
+
+
+def test_bodies_per_encoding():
+    payload = {"nodes": list(range(100))}
+    response = EncodedResponse(payload, LOADED_AT)
+    body, encoding = response.body_for("gzip, deflate")
+    assert encoding == "gzip" and json.loads(gzip.decompress(body)) == payload
+    body, encoding = response.body_for(None)
+    assert encoding is None and json.loads(body) == payload
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from schedule_store import DAY_NAMES
+
+MONDAY_MORNING = datetime(2026, 10, 12, 10, 30)
+SATURDAY_NOON = datetime(2026, 10, 17, 12, 0)
+
+
+def test_busy_rooms_match_occupancy(core):
+    availability = core.availability_index(core.snapshot)
+    graph = core.snapshot.graph
+    rooms = [name for i, name in enumerate(graph.names) if graph.node_type(i) == "room"]
+    for day in DAY_NAMES.values():
+        for minutes in range(7 * 60, 20 * 60, 10):
+            expected = {room for room in rooms if core.schedule.occupancy(room, day, minutes)}
+            assert availability.busy(day, minutes) == expected
+
+
+def test_free_rooms_are_scheduled_rooms_with_no_lecture(core):
+    scheduled = core.availability_index(core.snapshot).rooms
+    # Without free, the nearest rooms include ones that are never booked
+    assert {"342", "318A-Toilet"} & {r["name"] for r in core.nearest("318B", k=3)}
+
+    for at in (MONDAY_MORNING, SATURDAY_NOON):
+        results = core.nearest("318B", free=True, k=5, at=at)
+        assert results
+        day, minutes = DAY_NAMES[at.weekday()], at.hour * 60 + at.minute
+        for result in results:
+            assert result["name"] in scheduled
+            assert core.schedule.occupancy(result["name"], day, minutes) is None
+        times = [result["time_seconds"] for result in results]
+        assert times == sorted(times)
+
+    assert core.nearest("318B", free=True, k=1, at=SATURDAY_NOON)[0]["name"] == "323"
+    # 323 has a lecture on Monday morning
+    assert "323" not in {r["name"] for r in core.nearest("318B", free=True, k=5, at=MONDAY_MORNING)}
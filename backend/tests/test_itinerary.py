@@ -0,0 +1,76 @@
+import itertools
+import json
+import random
+from datetime import datetime
+
+from itinerary import cheapest_insertion, two_opt
+from schedule_store import ScheduleStore
+
+MORNING = datetime(2026, 10, 12, 8, 30)
+
+
+def tour_cost(cost, order):
+    return sum(cost[a][b] for a, b in zip(order, order[1:]))
+
+
+def random_costs(rng, n):
+    # Points on a line plus noise: directed, but with a clear best order
+    xs = [rng.uniform(0, 100) for _ in range(n)]
+    return [[abs(xs[a] - xs[b]) + rng.uniform(0, 5) for b in range(n)] for a in range(n)]
+
+
+def test_cheapest_insertion_can_go_before_the_first_anchor():
+    cost = [[0, 1, 5, 9], [1, 0, 4, 8], [5, 4, 0, 4], [9, 8, 4, 0]]
+    # Only the end (3) is fixed: the day starts wherever is cheapest
+    assert cheapest_insertion(cost, [3], [0, 1, 2], open_start=True, open_end=False) == [0, 1, 2, 3]
+    # A fixed start stays first
+    assert cheapest_insertion(cost, [3], [0, 1, 2], open_start=False, open_end=True)[0] == 3
+
+
+def test_reordering_keeps_anchors_and_finds_good_tours():
+    rng = random.Random(0)
+    for _ in range(50):
+        cost = random_costs(rng, 6)
+        for open_start, open_end in itertools.product((True, False), repeat=2):
+            anchors = ([0] if not open_start else []) + ([5] if not open_end else [])
+            free = [i for i in range(6) if i not in anchors]
+            order = two_opt(cost, cheapest_insertion(cost, anchors, free, open_start, open_end), anchors)
+            assert sorted(order) == list(range(6))
+            if not open_start:
+                assert order[0] == 0
+            if not open_end:
+                assert order[-1] == 5
+
+            best = min(tour_cost(cost, ([0] if not open_start else []) + list(p) +
+                                 ([5] if not open_end else []))
+                       for p in itertools.permutations(free))
+            assert tour_cost(cost, order) <= best * 1.25 + 1e-9
+
+
+def test_itinerary_without_start_ends_at_its_end(core):
+    plan = core.plan_itinerary(stops=["318A", "241", "203"], end="VIP", at=MORNING, reorder=True)
+    nodes = [stop["node"] for stop in plan["stops"]]
+    assert nodes[-1] == "VIP"
+    assert sorted(nodes[:-1]) == ["203", "241", "318A"]
+
+
+def test_itinerary_with_start_keeps_it_first(core):
+    plan = core.plan_itinerary(stops=["318A", "241", "203"], start="VIP", at=MORNING, reorder=True)
+    assert plan["stops"][0]["node"] == "VIP"
+
+
+def test_group_lectures_keeps_back_to_back_lectures(core, tmp_path, monkeypatch):
+    lectures = [
+        {"group": "A", "day": "Monday", "room": "241", "start": "09:00", "end": "10:00"},
+        {"group": "A", "day": "Monday", "room": "323", "start": "10:00", "end": "11:00"},
+        # The group split over two rooms: the first listed of the pair is kept
+        {"group": "A", "day": "Monday", "room": "318A", "start": "11:30", "end": "12:30"},
+        {"group": "A", "day": "Monday", "room": "318B", "start": "11:30", "end": "12:30"},
+        {"group": "B", "day": "Monday", "room": "203", "start": "09:00", "end": "10:00"},
+    ]
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"schedule": lectures}), encoding="utf-8")
+    monkeypatch.setattr(core, "schedule", ScheduleStore(str(path)))
+
+    kept = core.group_lectures("A", "Monday")
+    assert [entry["room"] for _, _, entry in kept] == ["241", "323", "318A"]
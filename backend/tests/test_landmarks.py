@@ -0,0 +1,30 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from map_graph import MODES, dijkstra
+
+MORNING = datetime(2026, 10, 12, 10, 30)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_landmarks_match_plain_astar(core, sample_pairs, mode):
+    for start, goal in sample_pairs(150, seed=1):
+        _, with_alt, _ = core.a_star(start, goal, mode, at=MORNING, use_landmarks=True)
+        _, without, _ = core.a_star(start, goal, mode, at=MORNING, use_landmarks=False)
+        assert with_alt == pytest.approx(without, abs=1e-6)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_landmark_bound_is_admissible(core, mode):
+    graph = core.snapshot.graph
+    table = core.snapshot.landmarks.table(mode)
+    # Travel times to a target are a Dijkstra from it over the reversed edges
+    reverse = graph.reversed()
+    for goal in random.Random(2).sample(core.destination_nodes(), 10):
+        target = graph.index[goal]
+        to_target, _, _ = dijkstra(reverse, target, reverse.weights(mode, False))
+        terms = table.target_terms(target)
+        for i in range(graph.node_count):
+            assert table.bound(terms, i) <= to_target[i] + 1e-6
@@ -0,0 +1,48 @@
+from route_cache import RouteCache
+
+
+def test_hits_and_lru_eviction():
+    cache = RouteCache(maxsize=2)
+    assert cache.get("a") is None
+    cache.put("a", b"a", nodes=["A"])
+    cache.put("b", b"b", nodes=["B"])
+    assert cache.get("a") == b"a"
+
+    # "b" is now the least recently used
+    cache.put("c", b"c", nodes=["C"])
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" and cache.get("c") == b"c"
+
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 2, 1)
+    assert stats["hit_rate"] == 3 / 5
+
+
+def test_expired_entries_are_misses():
+    cache = RouteCache(maxsize=2, ttl=-1)
+    cache.put("a", b"a")
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = RouteCache(maxsize=0)
+    cache.put("a", b"a")
+    assert cache.get("a") is None
+
+
+def test_map_changes_and_reopenings_drop_everything():
+    cache = RouteCache()
+    cache.bind("map-1")
+    cache.put("a", b"a", nodes=["A"])
+    cache.bind("map-1")
+    assert cache.get("a") == b"a"
+    cache.bind("map-2")
+    assert cache.get("a") is None
+
+    cache.put("a", b"a", nodes=["A"], version=1)
+    cache.clear(version=2)
+    assert cache.get("a") is None
+    # Older searches can't refill it
+    cache.put("a", b"a", nodes=["A"], version=1)
+    assert cache.get("a") is None
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+
+import route_table
+from map_graph import MODES
+
+MORNING = datetime(2026, 10, 12, 10, 30)
+BREAK = datetime(2026, 10, 12, 13, 30)
+
+
+def test_route_table_matches_astar(core, sample_pairs, assert_valid_path, tmp_path):
+    snap = core.snapshot
+    path = str(tmp_path / "route_table.bin")
+    table = route_table.build_route_table(snap.base_graph, core.destination_nodes(),
+                                          snap.map_hash, core.cost_params())
+    route_table.save_route_table(table, path)
+    loaded = route_table.load_route_table(path, snap.map_hash, core.cost_params())
+    assert loaded is not None
+    assert route_table.load_route_table(path, snap.map_hash, "other params") is None
+
+    for mode in MODES:
+        for at in (MORNING, BREAK):
+            is_break = core.is_break_time(at.hour)
+            for start, goal in sample_pairs(100, seed=3):
+                found, total_time, total_dist = core.a_star(start, goal, mode, at=at)
+                table_path, table_time, table_dist = loaded.lookup(snap.graph, start, goal,
+                                                                   mode, is_break)
+                assert table_time == pytest.approx(total_time, abs=1e-6)
+                assert table_dist == pytest.approx(total_dist, abs=1e-6)
+                if found:
+                    assert_valid_path(table_path, start, goal)
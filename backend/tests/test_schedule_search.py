@@ -0,0 +1,60 @@
+import json
+
+from schedule_search import ScheduleSearchIndex
+from schedule_store import ScheduleStore
+
+ENTRIES = [
+    {"course": "Linear Algebra", "room": "318A", "instructor": "Dr. Calc", "day": "Monday"},
+    {"course": "Calculus", "room": "241", "instructor": "Dr. Smith", "day": "Monday"},
+    {"course": "Calculus II", "room": "calc-lab", "instructor": "Dr. Smith", "day": "Tuesday"},
+    {"course": "Physics", "room": "203", "instructor": "Dr. Calculus", "day": "Monday"},
+    {"course": "Chemistry", "room": "318B", "instructor": "Dr. Jones", "day": "Friday"},
+]
+
+
+def index_for(tmp_path, entries=ENTRIES):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"schedule": entries}), encoding="utf-8")
+    return ScheduleSearchIndex(ScheduleStore(str(path)))
+
+
+def courses(results):
+    return [entry["course"] for entry in results]
+
+
+def test_ranking(tmp_path):
+    index = index_for(tmp_path)
+    # Course matches before instructor matches, ties in schedule order
+    total, results = index.search("calculus")
+    assert total == 3
+    assert courses(results) == ["Calculus", "Calculus II", "Physics"]
+
+    # Field weight (course 3, room 2, instructor 1) times 2 for an exact
+    # token, 1 for a prefix: the exact room "calc" beats the course prefix
+    _, results = index.search("calc")
+    assert courses(results) == ["Calculus II", "Calculus", "Linear Algebra", "Physics"]
+
+    # Every query token has to match
+    _, results = index.search("calc smith")
+    assert courses(results) == ["Calculus II", "Calculus"]
+    assert index.search("calculus jones") == (0, [])
+
+
+def test_substring_fallback(tmp_path):
+    index = index_for(tmp_path)
+    assert courses(index.search("lculus")[1]) == ["Calculus", "Calculus II", "Physics"]
+    assert index.search("318")[0] == 2
+
+
+def test_pagination(tmp_path):
+    entries = [{"course": f"Course {i}", "room": str(100 + i)} for i in range(25)]
+    index = index_for(tmp_path, entries)
+    total, everything = index.search("course")
+    assert total == 25 and len(everything) == 25
+
+    pages = [index.search("course", limit=10, offset=offset) for offset in (0, 10, 20)]
+    assert all(total == 25 for total, _ in pages)
+    assert [len(page) for _, page in pages] == [10, 10, 5]
+    assert [entry for _, page in pages for entry in page] == everything
+    assert index.search("course", limit=10, offset=30) == (25, [])
+    assert index.search("course", limit=0) == (25, [])
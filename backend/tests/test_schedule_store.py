@@ -0,0 +1,57 @@
+import json
+import os
+import random
+
+from schedule_store import ScheduleStore, parse_minutes
+
+ROOMS = ["318", "318A", "318B", "241", "203"]
+DAYS = ["Monday", "Tuesday"]
+
+
+def linear_occupancy(entries, target_room, day, minutes):
+    # The lookup occupancy() replaced: first matching entry in file order
+    for entry in entries:
+        if target_room in str(entry["room"]) and entry["day"] == day:
+            if parse_minutes(entry["start"]) <= minutes <= parse_minutes(entry["end"]):
+                return entry
+    return None
+
+
+def random_schedule(rng, count):
+    entries = []
+    for i in range(count):
+        start = rng.randrange(8 * 60, 18 * 60, 15)
+        end = start + rng.choice((30, 60, 90, 180))
+        entries.append({"group": f"G{i}", "room": rng.choice(ROOMS), "day": rng.choice(DAYS),
+                        "start": f"{start // 60:02d}:{start % 60:02d}",
+                        "end": f"{end // 60:02d}:{end % 60:02d}"})
+    return entries
+
+
+def test_occupancy_matches_linear_scan(tmp_path):
+    rng = random.Random(3)
+    entries = random_schedule(rng, 60)
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"schedule": entries}), encoding="utf-8")
+    store = ScheduleStore(str(path))
+
+    # Rooms match every schedule room containing their name ("318" is in "318A")
+    for target in ROOMS + ["31", "999"]:
+        for day in DAYS + ["Sunday"]:
+            for minutes in range(7 * 60, 22 * 60, 5):
+                assert store.occupancy(target, day, minutes) == linear_occupancy(entries, target, day, minutes)
+
+
+def test_schedule_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"schedule": []}), encoding="utf-8")
+    store = ScheduleStore(str(path))
+    assert store.occupancy("241", "Monday", 9 * 60) is None
+
+    lecture = {"group": "A", "room": "241", "day": "Monday", "start": "09:00", "end": "10:00"}
+    path.write_text(json.dumps({"schedule": [lecture]}), encoding="utf-8")
+    # Make sure the modification time moves even on coarse clocks
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.occupancy("241", "Monday", 10 * 60) == lecture
+    assert store.occupancy("241", "Monday", 10 * 60 + 1) is None
@@ -0,0 +1,42 @@
+import math
+import random
+
+import pytest
+
+from spatial_index import SpatialIndex
+
+
+def test_spatial_index_matches_brute_force(core):
+    graph = core.snapshot.graph
+    index = SpatialIndex(graph)
+    rng = random.Random(4)
+    floors = sorted(set(graph.floor))
+    xs, ys = list(graph.x), list(graph.y)
+
+    for _ in range(300):
+        floor = rng.choice(floors)
+        # Some points well outside the map too
+        x = rng.uniform(min(xs) - 200, max(xs) + 200)
+        y = rng.uniform(min(ys) - 200, max(ys) + 200)
+
+        on_floor = [i for i in range(graph.node_count) if graph.floor[i] == floor]
+        expected = sorted(math.hypot(graph.x[i] - x, graph.y[i] - y) for i in on_floor)[:3]
+        found = [d for _, d in index.nearest_nodes(floor, x, y, k=3)]
+        assert found == pytest.approx(expected)
+
+        best = math.inf
+        for a in on_floor:
+            for e in range(graph.offsets[a], graph.offsets[a + 1]):
+                b = graph.targets[e]
+                if graph.floor[b] != floor:
+                    continue
+                ax, ay = graph.x[a], graph.y[a]
+                dx, dy = graph.x[b] - ax, graph.y[b] - ay
+                length2 = dx*dx + dy*dy
+                t = min(max(((x - ax) * dx + (y - ay) * dy) / length2, 0.0), 1.0) if length2 else 0.0
+                best = min(best, math.hypot(ax + t * dx - x, ay + t * dy - y))
+        edge = index.nearest_edge(floor, x, y)
+        if best == math.inf:
+            assert edge is None
+        else:
+            assert edge[5] == pytest.approx(best)
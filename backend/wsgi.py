@@ -0,0 +1,35 @@
+import os
+
+from server import app
+
+
+# --- Production Entry Point ---
+# The Flask dev server (python backend/server.py) runs each request on a
+# thread, but all in one process: route searches are CPU bound and hold the
+# GIL, so it only ever uses one core, and it isn't built to be exposed. For
+# real traffic serve `wsgi:app` with a multi-worker WSGI server:
+#
+#   gunicorn --chdir backend --preload -w 4 --threads 4 -b 0.0.0.0:5000 wsgi:app
+#
+# --preload loads the map, route table and landmarks once in the master, and
+# the forked workers share them copy-on-write. Route searches are CPU bound
+# and hold the GIL, so use about one worker per core; threads only help
+# overlap I/O and cached responses. Every request works on one immutable map
+# snapshot, so reloads and closures on one thread never tear a search running
+# on another. Admin changes reach the other workers through shared files (see
+# shared_state.py), picked up at the start of their next request.
+#
+# Running this file serves the app with waitress instead (also on Windows):
+#
+#   python backend/wsgi.py
+
+if __name__ == "__main__":
+    try:
+        from waitress import serve
+    except ImportError:
+        raise SystemExit("waitress is not installed: pip install waitress (or run under gunicorn)")
+
+    serve(app,
+          host=os.environ.get("HOST", "0.0.0.0"),
+          port=int(os.environ.get("PORT", 5000)),
+          threads=int(os.environ.get("THREADS", 8)))